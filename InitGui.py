@@ -60,8 +60,10 @@ class MeshRemodelWorkbench(Workbench):
         import MeshRemodelCmd #needed files for FreeCAD commands
         self.list = ["MeshRemodelCreatePointsObject",
                     "MeshRemodelCreateWireFrameObject",
+                    "MeshRemodelCreateBoundaryLoops",
                     "MeshRemodelCreateCrossSectionsObject",
                     "MeshRemodelCreateCoplanarPointsObject",
+                    "MeshRemodelDetectPlanes",
                     "MeshRemodelAddSelectionObserver",
                     "MeshRemodelPartSolid",
                     "MeshRemodelCreatePointObject",
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+###################################################################################
+#
+#  MeshRemodelBenchmark.py
+#
+#  Copyright 2019 Mark Ganson <TheMarkster> mwganson at gmail
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+###################################################################################
+
+# Benchmarks for the numerical core (MeshRemodelGeomCore.py) on synthetic meshes and point clouds.
+# Runs without FreeCAD, only numpy is needed:
+#
+#   python MeshRemodelBenchmark.py -o baseline.json
+#   python MeshRemodelBenchmark.py --compare baseline.json
+#   python MeshRemodelBenchmark.py --sizes 10k,100k,1M,10M --only wireframe,circles
+#
+# Results are written as JSON (to stdout if no -o file), progress goes to stderr.
+# With --compare the results are matched by benchmark name and size against the stored
+# results and any that got slower by more than --tolerance are flagged, exit status is then 1.
+
+import sys, os, math, time, json, platform, argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import MeshRemodelGeomCore as mrc
+
+FORMAT = 1 #version of the JSON layout
+
+######################################################################################
+# synthetic inputs, size is number of facets for meshes, number of points for point clouds
+
+class Vector:
+    """stand in for FreeCAD.Vector, only x,y,z are used"""
+    __slots__ = ("x","y","z")
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+def sphereMesh(size, radius=10.0):
+    """closed latitude/longitude sphere with about size facets, returns (points, facets)"""
+    cols = max(int(math.sqrt(size / 2.0)), 3)
+    rows = max(int(size / (2.0 * cols)) + 1, 3) #bands of facets between the poles
+    theta = np.linspace(0, math.pi, rows + 1)[1:-1] #rings, poles left out
+    phi = np.linspace(0, 2*math.pi, cols, endpoint=False)
+    tt, pp = np.meshgrid(theta, phi, indexing="ij")
+    ring = np.column_stack((np.sin(tt).ravel()*np.cos(pp).ravel(), np.sin(tt).ravel()*np.sin(pp).ravel(), np.cos(tt).ravel()))
+    pts = np.vstack((ring, [[0,0,1],[0,0,-1]])) * radius
+    top = len(ring)
+    bottom = top + 1
+    cc = np.arange(cols)
+    nxt = (cc + 1) % cols
+    facets = [np.column_stack((np.full(cols, top), cc, nxt)),
+              np.column_stack((np.full(cols, bottom), (rows-2)*cols + nxt, (rows-2)*cols + cc))]
+    rr = np.arange(rows - 2)[:,None] * cols
+    a = (rr + cc).ravel()
+    b = (rr + nxt).ravel()
+    facets.append(np.column_stack((a, a + cols, b)))
+    facets.append(np.column_stack((b, a + cols, b + cols)))
+    return pts, np.concatenate(facets).astype(np.int64)
+
+def boxMesh(size, edge=10.0):
+    """cube with each of the 6 sides tessellated separately, about size facets
+    like a mesh read from an stl file the points on the cube edges are repeated, once per side
+    returns (points, facets)"""
+    k = max(int(math.sqrt(size / 12.0)), 1) #cells along each side of a face
+    uu, vv = np.meshgrid(np.linspace(0, edge, k + 1), np.linspace(0, edge, k + 1), indexing="ij")
+    uu = uu.ravel()
+    vv = vv.ravel()
+    zero = np.zeros_like(uu)
+    full = np.full_like(uu, edge)
+    sides = [(uu,vv,zero), (uu,vv,full), (uu,zero,vv), (uu,full,vv), (zero,uu,vv), (full,uu,vv)]
+    ii, jj = np.meshgrid(np.arange(k), np.arange(k), indexing="ij")
+    a = (ii * (k + 1) + jj).ravel()
+    grid = np.concatenate((np.column_stack((a, a + k + 1, a + 1)), np.column_stack((a + 1, a + k + 1, a + k + 2))))
+    pts = np.vstack([np.column_stack(side) for side in sides])
+    facets = np.vstack([grid + ii * (k + 1)**2 for ii in range(6)])
+    return pts, facets.astype(np.int64)
+
+def noisyPlane(size, noise=0.01, seed=1):
+    """size points scattered over a 100 x 100 square in a tilted plane, with normal noise added
+    a tenth of the points are moved well off the plane
+    returns (points, trio), trio is 3 points in the plane"""
+    rng = np.random.default_rng(seed)
+    u = rng.uniform(0, 100, size)
+    v = rng.uniform(0, 100, size)
+    w = rng.normal(0, noise, size)
+    w[::10] += rng.uniform(1, 10, len(w[::10]))
+    e1 = np.array([1.0, 0.0, 0.5]) / math.sqrt(1.25)
+    e2 = np.array([0.0, 1.0, 0.0])
+    n = np.cross(e1, e2)
+    pts = np.outer(u, e1) + np.outer(v, e2) + np.outer(w, n)
+    trio = [tuple(p) for p in (np.zeros(3), 100*e1, 100*e2)]
+    return pts, trio
+
+def polygonPoints(size, seed=1):
+    """size points around a noisy closed outline in the xy plane, shuffled"""
+    rng = np.random.default_rng(seed)
+    t = rng.permutation(np.linspace(0, 2*math.pi, size, endpoint=False))
+    r = 50 + 10*np.sin(5*t) + rng.normal(0, 0.01, size)
+    return np.column_stack((r*np.cos(t), r*np.sin(t), np.zeros(size)))
+
+######################################################################################
+# benchmarks, each is (name, group, largest size or 0 for no limit, setup)
+# setup(size) is not timed, it returns the function to time and the number of items it works on
+
+def setupVectors(size):
+    pts, facets = sphereMesh(size)
+    vecs = [Vector(*p) for p in pts.tolist()]
+    return lambda: mrc.vectorsToArray(vecs), len(vecs)
+
+def setupWeld(size):
+    pts, facets = boxMesh(size)
+    return lambda: mrc.weldPoints(pts, 1e-4), len(pts)
+
+def setupFilter(size):
+    pts, facets = boxMesh(size)
+    region = ("Sphere", [(5.0,5.0,5.0)], 7.0)
+    voxel = 10.0 / math.sqrt(len(pts) / 60.0) #about 10% of the points kept
+    return lambda: mrc.filterPoints(pts, region, 1e-4, voxel), len(pts)
+
+def setupUniqueEdges(size):
+    pts, facets = sphereMesh(size)
+    return lambda: mrc.uniqueEdges(facets), len(facets)
+
+def setupParallelEdges(size):
+    pts, facets = sphereMesh(size)
+    return lambda: mrc.parallelUniqueEdges(facets), len(facets)
+
+def setupDefects(size):
+    pts, facets = boxMesh(size)
+    return lambda: mrc.facetDefects(pts, facets, 1e-6), len(facets)
+
+def setupFeatureEdges(size):
+    pts, facets = sphereMesh(size)
+    return lambda: mrc.featureEdges(pts, facets, 30), len(facets)
+
+def setupBoundary(size):
+    pts, facets = boxMesh(size) #the unwelded sides are 6 open squares
+    return lambda: mrc.chainEdges(mrc.boundaryEdges(facets)), len(facets)
+
+def setupCoplanar(size):
+    pts, trio = noisyPlane(size)
+    return lambda: mrc.coplanarMask(pts, trio, 0.05), len(pts)
+
+def setupPlanes(size):
+    pts, facets = boxMesh(size)
+    pts = pts + np.random.default_rng(1).normal(0, 0.005, pts.shape)
+    return lambda: mrc.ransacPlanes(pts, 0.03, 500), len(pts)
+
+def setupFlatten(size):
+    pts, trio = noisyPlane(size)
+    return lambda: mrc.flattenArray(pts, trio[0], np.cross(np.subtract(trio[1], trio[0]), np.subtract(trio[2], trio[0]))), len(pts)
+
+def setupSort(size):
+    pts = polygonPoints(size)
+    return lambda: mrc.nearestNeighborTour(pts), len(pts)
+
+def setupSortImprove(size):
+    pts = polygonPoints(size)
+    return lambda: mrc.nearestNeighborTour(pts, True), len(pts)
+
+def setupCircumcircles(size):
+    pts, facets = sphereMesh(size)
+    tris = mrc.triangleArray(pts, facets)
+    return lambda: (mrc.circumcenters(tris), mrc.circumradii(tris)), len(tris)
+
+def setupIncircles(size):
+    pts, facets = sphereMesh(size)
+    tris = mrc.triangleArray(pts, facets)
+    return lambda: (mrc.incenters(tris), mrc.inradii(tris)), len(tris)
+
+BENCHMARKS = [
+    ("points.vectorsToArray", "points", 1000000, setupVectors),
+    ("points.weld", "points", 0, setupWeld),
+    ("points.filter", "points", 0, setupFilter),
+    ("wireframe.uniqueEdges", "wireframe", 0, setupUniqueEdges),
+    ("wireframe.parallelUniqueEdges", "wireframe", 0, setupParallelEdges),
+    ("wireframe.facetDefects", "wireframe", 0, setupDefects),
+    ("wireframe.featureEdges", "wireframe", 0, setupFeatureEdges),
+    ("wireframe.boundaryLoops", "wireframe", 0, setupBoundary),
+    ("coplanar.coplanarMask", "coplanar", 0, setupCoplanar),
+    ("coplanar.ransacPlanes", "coplanar", 0, setupPlanes),
+    ("flatten.flattenArray", "flatten", 0, setupFlatten),
+    ("sort.nearestNeighborTour", "sort", 1000000, setupSort),
+    ("sort.nearestNeighborTour.improve", "sort", 100000, setupSortImprove),
+    ("circles.circumcircles", "circles", 0, setupCircumcircles),
+    ("circles.incircles", "circles", 0, setupIncircles),
+]
+
+######################################################################################
+
+def parseSize(text):
+    """'10k' -> 10000, '1M' -> 1000000"""
+    text = text.strip()
+    scale = {"k":1000, "K":1000, "m":1000000, "M":1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+def runBenchmarks(sizes, groups=None, repeat=3, log=None):
+    """run the benchmarks of the given groups (all if None) at each size
+    returns list of result dictionaries"""
+    results = []
+    for name, group, largest, setup in BENCHMARKS:
+        if groups and group not in groups and name not in groups:
+            continue
+        for size in sizes:
+            if largest and size > largest:
+                if log:
+                    log("%-34s %10d  skipped (limit %d)\n" % (name, size, largest))
+                continue
+            func, items = setup(size)
+            times = []
+            for ii in range(repeat):
+                start = time.perf_counter()
+                func()
+                times.append(time.perf_counter() - start)
+            del func
+            result = {"name": name, "size": size, "items": items, "best": min(times),
+                      "median": float(np.median(times)), "repeat": repeat}
+            results.append(result)
+            if log:
+                log("%-34s %10d  %10.4f s  %12.0f items/s\n" % (name, size, result["best"], items / max(result["best"], 1e-12)))
+    return results
+
+def compareResults(results, baseline, tolerance):
+    """match results to baseline by name and size, compare best times
+    returns list of (name, size, baseline seconds, seconds, ratio, regressed)"""
+    stored = dict(((r["name"], r["size"]), r) for r in baseline["results"])
+    rows = []
+    for r in results:
+        old = stored.get((r["name"], r["size"]))
+        if not old:
+            continue
+        ratio = r["best"] / old["best"] if old["best"] > 0 else float("inf")
+        rows.append((r["name"], r["size"], old["best"], r["best"], ratio, ratio > 1.0 + tolerance))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the MeshRemodel geometry core on synthetic meshes and point clouds")
+    parser.add_argument("--sizes", default="10k,100k,1M", help="comma separated sizes, e.g. 10k,100k,1M,10M (default: 10k,100k,1M)")
+    parser.add_argument("--only", default="", help="comma separated groups or benchmark names: "+", ".join(sorted(set(b[1] for b in BENCHMARKS))))
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the best time is compared (default: 3)")
+    parser.add_argument("-o", "--output", default="", help="write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", default="", help="baseline JSON file from an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="fraction slower than baseline counted as a regression (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    sizes = [parseSize(s) for s in args.sizes.split(",") if s.strip()]
+    groups = set(s.strip() for s in args.only.split(",") if s.strip())
+    log = sys.stderr.write
+    results = runBenchmarks(sizes, groups, max(args.repeat, 1), log)
+    report = {
+        "format": FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compareResults(results, baseline, args.tolerance)
+        regressions = 0
+        log("\n%-34s %10s %10s %10s %7s\n" % ("benchmark", "size", "baseline", "now", "ratio"))
+        for name, size, old, new, ratio, regressed in rows:
+            log("%-34s %10d %10.4f %10.4f %7.2f%s\n" % (name, size, old, new, ratio, "  REGRESSION" if regressed else ""))
+            regressions += regressed
+        log("%d of %d benchmarks slower than baseline by more than %d%%\n" % (regressions, len(rows), round(args.tolerance*100)))
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -33,7 +33,10 @@ version = 1.8918
 import FreeCAD, FreeCADGui, Part, os, math
 from PySide import QtCore, QtGui
 import Draft, DraftGeomUtils, DraftVecUtils
-import time
+import time, json
+import numpy as np
+import MeshRemodelGeomCore
+from pivy import coin
 
 
 if FreeCAD.GuiUp:
@@ -61,6 +64,40 @@ def fixTip(tip):
 class MeshRemodelGeomUtils(object):
     """Geometry Utilities"""
 
+    #numerical core, plain numpy arrays, see MeshRemodelGeomCore.py
+    PointIndex = MeshRemodelGeomCore.PointIndex
+    vectorsToArray = staticmethod(MeshRemodelGeomCore.vectorsToArray)
+    indicesToVectors = staticmethod(MeshRemodelGeomCore.indicesToVectors)
+    vectorsToIndices = staticmethod(MeshRemodelGeomCore.vectorsToIndices)
+    firstUnique = staticmethod(MeshRemodelGeomCore.firstUnique)
+    gridCells = staticmethod(MeshRemodelGeomCore.gridCells)
+    weldPoints = staticmethod(MeshRemodelGeomCore.weldPoints)
+    voxelDecimate = staticmethod(MeshRemodelGeomCore.voxelDecimate)
+    voxelSizeForCount = staticmethod(MeshRemodelGeomCore.voxelSizeForCount)
+    regionMask = staticmethod(MeshRemodelGeomCore.regionMask)
+    fingerprint = staticmethod(MeshRemodelGeomCore.fingerprint)
+    improveTour = staticmethod(MeshRemodelGeomCore.improveTour)
+    edgeKeys = staticmethod(MeshRemodelGeomCore.edgeKeys)
+    uniqueEdges = staticmethod(MeshRemodelGeomCore.uniqueEdges)
+    facetNormals = staticmethod(MeshRemodelGeomCore.facetNormals)
+    featureEdges = staticmethod(MeshRemodelGeomCore.featureEdges)
+    facetDefects = staticmethod(MeshRemodelGeomCore.facetDefects)
+    boundaryEdges = staticmethod(MeshRemodelGeomCore.boundaryEdges)
+    edgeLengths = staticmethod(MeshRemodelGeomCore.edgeLengths)
+    chainEdges = staticmethod(MeshRemodelGeomCore.chainEdges)
+    planeDistances = staticmethod(MeshRemodelGeomCore.planeDistances)
+    coplanarMask = staticmethod(MeshRemodelGeomCore.coplanarMask)
+    distanceOrder = staticmethod(MeshRemodelGeomCore.distanceOrder)
+    spreadTrio = staticmethod(MeshRemodelGeomCore.spreadTrio)
+    ransacPlanes = staticmethod(MeshRemodelGeomCore.ransacPlanes)
+    flattenArray = staticmethod(MeshRemodelGeomCore.flattenArray)
+    triangleArray = staticmethod(MeshRemodelGeomCore.triangleArray)
+    triangleAreas = staticmethod(MeshRemodelGeomCore.triangleAreas)
+    circumcenters = staticmethod(MeshRemodelGeomCore.circumcenters)
+    circumradii = staticmethod(MeshRemodelGeomCore.circumradii)
+    incenters = staticmethod(MeshRemodelGeomCore.incenters)
+    inradii = staticmethod(MeshRemodelGeomCore.inradii)
+
     #progress bar on status bar with cancel button
     class MRProgress:
         def __init__(self):
@@ -70,11 +107,13 @@ class MeshRemodelGeomUtils(object):
             self.bCanceled = False
             self.value = 0
             self.total = 0
-            self.mw = FreeCADGui.getMainWindow()
+            self.mw = None #main window, looked up when the progress bar is made
             self.lastUpdate = time.time()
 
         def makeProgressBar(self,total=0,buttonText = "Cancel",tooltip = "Cancel current operation",updateInterval = .5):
             """total is max value for progress bar, mod = number of updates you want"""
+            if self.mw is None:
+                self.mw = FreeCADGui.getMainWindow()
             self.btn = QtGui.QPushButton(buttonText)
             self.btn.setToolTip(tooltip)
             self.btn.clicked.connect(self.on_clicked)
@@ -98,8 +137,9 @@ class MeshRemodelGeomUtils(object):
             self.bCanceled = True
             self.killProgressBar()
 
-        def isCanceled(self):
-            self.value += 1
+        def isCanceled(self,step=1):
+            """step is amount to advance progress bar, e.g. size of a batch of work"""
+            self.value += step
             timeNow = time.time()
             if timeNow - self.lastUpdate >= self.updateInterval:
                 self.lastUpdate = timeNow
@@ -165,11 +205,14 @@ class MeshRemodelGeomUtils(object):
         return False
 
     def hasPoint(self,pt,lis,tol):
-        """hasPoint(pt,lis,tol)"""
-        for l in lis:
-            if self.isSamePoint(pt,l,tol):
-                return True
-        return False
+        """hasPoint(pt,lis,tol)
+            lis is a list of vectors or a PointIndex"""
+        if isinstance(lis, self.PointIndex):
+            return lis.hasPoint(pt,tol)
+        if not lis:
+            return False
+        d = ((self.vectorsToArray(lis) - np.array([pt.x,pt.y,pt.z]))**2).sum(axis=1)
+        return bool((d < tol*tol).any())
 
     def isSamePoint(self,A,B,tol):
         """isSamePoint(A,B,tol)"""
@@ -197,72 +240,292 @@ class MeshRemodelGeomUtils(object):
             3d distance between x1,y1,z1 and x2,y2,z2 float parameters"""
         return math.sqrt((x1 - x2)**2 + (y1 - y2)**2 + (z1 - z2)**2)
 
-    def sortPoints(self,pts):
-        """ sortPoints(pts)
+    def getPointsArray(self, obj):
+        """ getPointsArray(obj)
+            obj is a mesh object, a points cloud object, or any object with a Shape
+            returns Nx3 numpy array of its vertex coordinates
+            mesh points are read once via Mesh.Topology instead of one MeshPoint at a time"""
+        if hasattr(obj,"Mesh"):
+            return self.vectorsToArray(obj.Mesh.Topology[0])
+        elif hasattr(obj,"Points") and hasattr(obj.Points,"Points"): #points cloud
+            return self.vectorsToArray(obj.Points.Points)
+        elif hasattr(obj,"Shape"):
+            return self.vectorsToArray([v.Point for v in obj.Shape.Vertexes])
+        elif hasattr(obj,"Proxy") and hasattr(obj.Proxy,"getArray"): #lightweight MeshRemodel points, wireframe or coplanar object
+            return obj.Proxy.getArray(obj).copy()
+        raise Exception("MeshRemodel GeomUtils Error: getPointsArray() unsupported object: "+obj.Label+"\n")
+
+    def getVertexPoint(self, obj, subname):
+        """ getVertexPoint(obj, subname)
+            obj is an object with a Shape or a lightweight MeshRemodel points object
+            subname is the name of the vertex, e.g. "Vertex12"
+            returns the vector of that vertex"""
+        idx = int(subname[6:])-1
+        if hasattr(obj,"Shape"):
+            return obj.Shape.Vertexes[idx].Point
+        return FreeCAD.Vector(*obj.Proxy.getArray(obj)[idx]) #lightweight object, avoid copying all of obj.Points
+
+    def getSubObjects(self, selEx):
+        """ getSubObjects(selEx)
+            selEx is an item of Gui.Selection.getSelectionEx()
+            returns selEx.SubObjects, or for lightweight points and wireframe objects, which have no shape,
+            Part vertices and edges made from the selected sub elements, only the ones selected"""
+        obj = selEx.Object
+        if hasattr(obj,"Shape"):
+            return selEx.SubObjects
+        subs = []
+        for name in selEx.SubElementNames:
+            if name.startswith("Vertex"):
+                subs.append(Part.Vertex(self.getVertexPoint(obj,name)))
+            elif name.startswith("Edge") and hasattr(obj.Proxy,"getEdge"):
+                subs.append(obj.Proxy.getEdge(obj,int(name[4:])-1))
+        return subs
+
+    def getRegion(self, sel):
+        """ getRegion(sel)
+            sel is selection ex list, sel[0] being the mesh
+            region of interest is taken from the 2nd selected object (or face): if it is a planar face
+            the half-space its normal points to, else its bounding box.  With no 2nd selection the
+            region is spheres of radius CropRadius (see settings) around the points picked on the mesh
+            returns region tuple for regionMask() or None if the selection defines no region"""
+        if len(sel) >= 2:
+            shape = sel[1].SubObjects[0] if sel[1].HasSubObjects else sel[1].Object.Shape
+            if len(shape.Faces) == 1 and isinstance(shape.Faces[0].Surface, Part.Plane):
+                face = shape.Faces[0]
+                return ("HalfSpace", tuple(face.Vertexes[0].Point), tuple(face.normalAt(0,0)))
+            bb = shape.BoundBox
+            return ("Box", (bb.XMin,bb.YMin,bb.ZMin), (bb.XMax,bb.YMax,bb.ZMax))
+        if sel and sel[0].PickedPoints:
+            pg = FreeCAD.ParamGet("User parameter:Plugins/MeshRemodel")
+            radius = pg.GetFloat("CropRadius",10.0)
+            return ("Sphere", [tuple(p) for p in sel[0].PickedPoints], radius)
+        return None
+
+    def filterPoints(self, arr, region=None, weldTolerance=0, voxelSize=0):
+        """ filterPoints(arr, region=None, weldTolerance=0, voxelSize=0)
+            see MeshRemodelGeomCore.filterPoints(), reports to the report view"""
+        return MeshRemodelGeomCore.filterPoints(arr, region, weldTolerance, voxelSize, FreeCAD.Console.PrintMessage)
+
+    def parallelUniqueEdges(self, facets, threads=0, chunks=0):
+        """ parallelUniqueEdges(facets, threads=0, chunks=0)
+            see MeshRemodelGeomCore.parallelUniqueEdges()
+            progress bar is updated as each chunk finishes, returns None if the user cancels"""
+        pb = self.MRProgress()
+        pb.makeProgressBar(0,"Cancel","Cancel Wireframe generation",0)
+        def progress(done, total):
+            pb.pb.setMaximum(total)
+            return pb.isCanceled()
+        edges = MeshRemodelGeomCore.parallelUniqueEdges(facets, threads, chunks, progress)
+        if edges is None:
+            FreeCAD.Console.PrintWarning("MeshRemodel: WireFrame creation canceled.\n")
+        else:
+            pb.killProgressBar()
+        return edges
+
+    def makeLinesCompound(self, arr, edges, batchSize=50000):
+        """ makeLinesCompound(arr, edges, batchSize=50000)
+            arr is Nx3 array of points, edges is Kx2 array of indices into arr
+            makes the Part lines batchSize at a time, progress bar is updated after each batch
+            returns compound of lines, which will be incomplete if the user cancels"""
+        lines = []
+        total = len(edges)
+        pb = self.MRProgress()
+        pb.makeProgressBar(total,"Cancel","Cancel Wireframe generation")
+        for start in range(0, total, batchSize):
+            batch = edges[start:start+batchSize]
+            ends = zip(arr[batch[:,0]].tolist(), arr[batch[:,1]].tolist())
+            lines.extend([Part.makeLine(tuple(a),tuple(b)) for a,b in ends])
+            if pb.isCanceled(len(batch)):
+                FreeCAD.Console.PrintWarning("MeshRemodel: WireFrame creation canceled.  WireFrame may be incomplete.\n")
+                break
+        pb.killProgressBar()
+        return Part.makeCompound(lines)
+
+    def makePolylinesCompound(self, arr, chains):
+        """ makePolylinesCompound(arr, chains)
+            arr is Nx3 array of points, chains is list of lists of indices into arr (see chainEdges())
+            makes one Part polygon wire per chain, or a line for a chain of 1 edge,
+            progress bar is updated by the number of edges
+            returns compound of wires and lines, which will be incomplete if the user cancels"""
+        wires = []
+        pb = self.MRProgress()
+        pb.makeProgressBar(sum(len(c) - 1 for c in chains),"Cancel","Cancel Wireframe generation")
+        for chain in chains:
+            if len(chain) == 2:
+                a, b = arr[chain].tolist()
+                wires.append(Part.makeLine(tuple(a),tuple(b)))
+            else:
+                wires.append(Part.makePolygon([FreeCAD.Vector(*p) for p in arr[chain].tolist()]))
+            if pb.isCanceled(len(chain) - 1):
+                FreeCAD.Console.PrintWarning("MeshRemodel: WireFrame creation canceled.  WireFrame may be incomplete.\n")
+                break
+        pb.killProgressBar()
+        return Part.makeCompound(wires)
+
+    def makePointsCompound(self, arr, batchSize=100000):
+        """ makePointsCompound(arr, batchSize=100000)
+            arr is Nx3 array of coordinates
+            makes the Part.Vertex shapes batchSize at a time, progress bar is updated after each batch
+            returns compound of vertices, which will be incomplete if the user cancels"""
+        return Part.makeCompound(self.makeVertexes(arr, batchSize))
+
+    def makeVertexes(self, arr, batchSize=100000):
+        """ makeVertexes(arr, batchSize=100000)
+            arr is Nx3 array of coordinates
+            makes the Part.Vertex shapes batchSize at a time, progress bar is updated after each batch
+            returns list of vertices, which will be incomplete if the user cancels"""
+        verts = []
+        total = len(arr)
+        pb = self.MRProgress()
+        pb.makeProgressBar(total,"Cancel","Cancel creating points")
+        for start in range(0, total, batchSize):
+            batch = arr[start:start+batchSize].tolist()
+            verts.extend([Part.Vertex(x,y,z) for x,y,z in batch])
+            if pb.isCanceled(len(batch)):
+                FreeCAD.Console.PrintWarning("MeshRemodel: Points creation canceled.  Object may be incomplete.\n")
+                break
+        pb.killProgressBar()
+        return verts
+
+    def sortPoints(self,pts,improve=False):
+        """ sortPoints(pts,improve=False)
             sort pts, a list of vectors, according to distance from one point to the next
             pts[0] is taken first, then the nearest point to it is placed at pts[1]
             then pts[1] is used to find the nearest point to it and placed at pts[2], and so on
+            duplicate points are skipped and pts[0] is added again at the end to close the loop
+            if improve is True, crossings in the closed loop are then removed with 2-opt moves
+            (see MeshRemodelGeomCore.nearestNeighborTour())
         """
-        newList = [pts[0]]
-        for ii in range(0, len(pts)):
-            newList.extend([self.nearestPoint(newList[ii],pts,newList)])
-        return newList
+        if len(pts) == 0:
+            return []
+        return [pts[ii] for ii in MeshRemodelGeomCore.nearestNeighborTour(self.vectorsToArray(pts), improve)] + [pts[0]]
 
     def flattenPoints(self, pts, align_plane):
         """ project points to align_plane.
-            pts is list of Part.Vertex objects
+            pts is list of Part.Vertex objects or Nx3 array of coordinates
             align_plane is part::plane object or 
             can be any object with a face (face1 will be used)
             returns: new list of Part.Vertex objects on the plane"""
         plane = align_plane.Shape.Faces[0]
         normal = plane.normalAt(0,0)
         base = align_plane.Shape.Vertexes[0].Point
-        verts = []
-        flatPts = [] #eliminate duplicate points
-        pb = gu.MRProgress()
-        pb.makeProgressBar(len(pts),buttonText = "Cancel Phase1/2",tooltip="Cancel projecting points to plane")
-        for p in pts:
-            fpt = p.Point.projectToPlane(base,normal)
-            if not self.hasPoint(fpt,flatPts,1e-7):
-                flatPts.append(fpt)
-            if pb.isCanceled():
-                FreeCAD.Console.PrintWarning("Phase 1 / 2 canceled, object may be incomplete.\n")
-                break
-        pb.killProgressBar()
-
-        pb.makeProgressBar(len(flatPts),"Cancel Phase2/2")
-        for p in flatPts:
-            verts.append(Part.Vertex(p))
-            if pb.isCanceled():
-                FreeCAD.Console.PrintWarning("Phase 2 / 2 canceled, object may be incomplete.\n")
-                break
-        pb.killProgressBar()
-        return verts
+        if not isinstance(pts, np.ndarray):
+            pts = self.vectorsToArray([p.Point for p in pts])
+        return self.makeVertexes(self.flattenArray(pts, base, normal))
 
     def nearestPoint(self, pt, pts, exclude):
         """ nearestPoint(pt, pts, exclude)
-            pt is a vector, pts a list of vectors
-            exlude is a list of vectors to exclude from process
-            return nearest point to pt in pts and not in exclude"""
+            pt is a vector, pts a list of vectors or a PointIndex
+            exlude is a list of vectors to exclude from process, or a boolean mask if pts is a PointIndex
+            return nearest point to pt in pts and not in exclude
+            for many queries on the same points use a PointIndex, a list is read again on every call"""
+        if isinstance(pts, self.PointIndex):
+            idx = pts.nearest(pt, exclude)[0]
+            if idx == -1:
+                raise Exception("MeshRemodel GeomUtils Error: nearestPoint() no points left in index\n")
+            return FreeCAD.Vector(*pts.arr[idx])
         if len(pts) == 0: #should never happen
             raise Exception("MeshRemodel GeomUtils Error: nearestPoint() pts length = 0\n")
-        nearest = pts[0]
-        d = 10**100
-        for p in pts:
-            if p in exclude:
-                continue
-            dis = self.dist(pt, p)
-            if dis < d:
-                d = dis
-                nearest = p
-        return nearest
+        arr = self.vectorsToArray(pts) + 0.0 #-0.0 becomes 0.0, so equal points have equal bytes
+        d = ((arr - np.array([pt.x,pt.y,pt.z]))**2).sum(axis=1)
+        if len(exclude):
+            row = np.dtype((np.void, 24)) #each point as one value, compared exactly
+            excluded = (self.vectorsToArray(exclude) + 0.0).view(row).ravel()
+            d[np.isin(arr.view(row).ravel(), excluded)] = np.inf
+        ii = int(np.argmin(d))
+        return pts[ii] if d[ii] < np.inf else pts[0]
+
+    def getPointsStamp(self, obj):
+        """ getPointsStamp(obj)
+            obj is a mesh, points cloud or any object with a Shape
+            returns a value that changes when the object's points change, cheap to get
+            (no vertices are made)"""
+        if hasattr(obj,"Mesh"):
+            return (obj.Mesh.CountPoints, str(obj.Mesh.BoundBox))
+        elif hasattr(obj,"Points") and hasattr(obj.Points,"Points"):
+            return (obj.Points.CountPoints, str(obj.Points.BoundBox))
+        return obj.Shape.hashCode()
+
+    class CacheObserver:
+        """document observer dropping the cached arrays and indices of objects as they change or go away,
+        the stamps alone miss edits that keep the number of points and the bounding box"""
+        def __init__(self, gu):
+            self.gu = gu
+
+        def slotChangedObject(self, obj, prop):
+            if prop in ("Mesh","Points","Shape"):
+                self.gu.forgetPoints(obj.Document.Name, obj.Name)
+
+        def slotDeletedObject(self, obj):
+            self.gu.forgetPoints(obj.Document.Name, obj.Name)
+
+        def slotDeletedDocument(self, doc):
+            self.gu.forgetPoints(doc.Name)
+
+    def getCache(self, name):
+        """ getCache(name)
+            returns the dict of cached values called name, keyed by (document name, object name)
+            made on first use, along with the document observer that empties it"""
+        if not hasattr(self,"cacheObserver"):
+            self.cacheObserver = self.CacheObserver(self)
+            FreeCAD.addDocumentObserver(self.cacheObserver)
+        if not hasattr(self,name):
+            setattr(self,name,{})
+        return getattr(self,name)
+
+    def forgetPoints(self, docName, objName=None):
+        """ forgetPoints(docName, objName=None)
+            drops the cached arrays and indices of object objName, or of all objects of the document if None"""
+        for cache in (getattr(self,"arrayCache",{}), getattr(self,"indexCache",{})):
+            for key in [k for k in cache if k[0] == docName and objName in (None, k[1])]:
+                del cache[key]
+
+    def getCachedPointsArray(self, obj):
+        """ getCachedPointsArray(obj)
+            same as getPointsArray(obj), but the array is made once and kept until the object's points change,
+            so repeated recomputes of objects based on obj do not read all of its vertices again
+            the array is shared and read only, copy it before modifying"""
+        if hasattr(obj,"Proxy") and hasattr(obj.Proxy,"getArray"): #lightweight, kept by the object itself
+            return obj.Proxy.getArray(obj)
+        stamp = self.getPointsStamp(obj)
+        cache = self.getCache("arrayCache")
+        key = (obj.Document.Name, obj.Name)
+        if key not in cache or cache[key][0] != stamp:
+            arr = self.getPointsArray(obj)
+            arr.flags.writeable = False
+            cache[key] = (stamp, arr)
+        return cache[key][1]
+
+    def getPointIndex(self, obj):
+        """ getPointIndex(obj)
+            obj is a mesh, points cloud, lightweight points object or any object with a Shape
+            returns PointIndex of its points, built once and kept until the object's points change
+            the index is shared, only query it, do not remove points from it"""
+        if hasattr(obj,"Proxy") and hasattr(obj.Proxy,"getIndex"): #lightweight, kept by the object itself
+            return obj.Proxy.getIndex(obj)
+        stamp = self.getPointsStamp(obj)
+        cache = self.getCache("indexCache")
+        key = (obj.Document.Name, obj.Name)
+        if key not in cache or cache[key][0] != stamp:
+            cache[key] = (stamp, self.PointIndex(self.getCachedPointsArray(obj)))
+        return cache[key][1]
+
+    def planePlacement(self, A, B, C):
+        """ planePlacement(A, B, C)
+            A,B,C are non-colinear vectors
+            return placement on the plane through A,B,C, the same as attaching with
+            MapMode = ThreePointsPlane: origin at A, X axis toward B"""
+        xaxis = B.sub(A).normalize()
+        zaxis = xaxis.cross(C.sub(A)).normalize()
+        yaxis = zaxis.cross(xaxis)
+        return FreeCAD.Placement(A, FreeCAD.Rotation(xaxis, yaxis, zaxis, "ZXY"))
 
     def isColinear(self,A,B,C):
         """ isColinear(A, B, C)
             determine whether vectors A,B,C are colinear """
         return DraftVecUtils.isColinear([A,B,C])
 
-    def incenter(A,B,C):
+    def incenter(self,A,B,C):
         """ incenter(A, B, C)
             return incenter (vector) of triangle at vectors A,B,C 
             incenter is center of circle fitting inside the triangle
@@ -288,13 +551,16 @@ class MeshRemodelGeomUtils(object):
         I = FreeCAD.Base.Vector(Ix,Iy,Iz)
         return I
 
-    def inradius(A,B,C):
+    def inradius(self,A,B,C):
         """ inradius(A, B, C)
             return inradius of triangle A,B,C 
             this is radius of incircle, the circle that
             fits inside the triangle, tangent to all 3 sides
         """
-        return self.dist(A, self.incenter(A,B,C))
+        a = self.dist(B,C)
+        b = self.dist(C,A)
+        c = self.dist(A,B)
+        return 2.0 * self.sss_area(a,b,c) / (a+b+c) #area = inradius * semiperimeter
 
 #python code below was adapted from this javascript code
 #from here: https://gamedev.stackexchange.com/questions/60630/how-do-i-find-the-circumcenter-of-a-triangle-in-3d
@@ -351,8 +617,6 @@ class MeshRemodelGeomUtils(object):
         """
         return self.dist(A, self.circumcenter(A,B,C))
 
-
-
 gu = MeshRemodelGeomUtils()
 #######################################################################################
 # Settings
@@ -379,6 +643,17 @@ class MeshRemodelSettingsCommandClass(object):
         prec = pg.GetInt("SketchRadiusPrecision", 1)
         coplanar_tol = pg.GetFloat("CoplanarTolerance",.01)
         wireframe_tol = pg.GetFloat("WireFrameTolerance",.01)
+        lightweight = pg.GetBool("LightweightPoints",True)
+        weld_tol = pg.GetFloat("WeldTolerance",0.0)
+        decimate_count = pg.GetInt("DecimateCount",50000)
+        crop_radius = pg.GetFloat("CropRadius",10.0)
+        feature_angle = pg.GetFloat("FeatureAngle",30.0)
+        chain = pg.GetBool("ChainWireFrameEdges",True)
+        threads = pg.GetInt("WireFrameThreads",0)
+        clean = pg.GetBool("CleanWireFrameFacets",True)
+        improve = pg.GetBool("ImproveSortedPoints",False)
+        plane_threshold = pg.GetFloat("PlaneThreshold",0.1)
+        plane_min_points = pg.GetInt("PlaneMinPoints",500)
         items=[("","*")[keep]+"Keep the toolbar active",
             ("","*")[not keep]+"Do not keep the toolbar active",
             "Change point size ("+str(point_size)+")",
@@ -386,6 +661,21 @@ class MeshRemodelSettingsCommandClass(object):
             "Change sketch radius precision ("+str(prec)+")",
             "Change coplanar tolerance ("+str(coplanar_tol)+")",
             "Change wireframe tolerance("+str(wireframe_tol)+")",
+            ("","*")[lightweight]+"Create lightweight points, wireframe and coplanar objects",
+            ("","*")[not lightweight]+"Create points, wireframe and coplanar objects as Part compounds",
+            "Change weld tolerance ("+str(weld_tol)+")",
+            "Change decimated points count ("+str(decimate_count)+")",
+            "Change crop radius ("+str(crop_radius)+")",
+            "Change feature angle ("+str(feature_angle)+")",
+            ("","*")[chain]+"Chain compound wireframe edges into polylines",
+            ("","*")[not chain]+"Make compound wireframe edges as separate lines",
+            "Change wireframe threads ("+str(threads)+")",
+            ("","*")[clean]+"Skip defective facets when creating wireframes",
+            ("","*")[not clean]+"Use all facets when creating wireframes",
+            ("","*")[improve]+"Remove crossings when sorting points (Alt+Click polygon / bspline)",
+            ("","*")[not improve]+"Nearest point order only when sorting points",
+            "Change plane detection threshold ("+str(plane_threshold)+")",
+            "Change plane detection min points ("+str(plane_min_points)+")",
             "Cancel"]
         item,ok = QtGui.QInputDialog.getItem(window,'Mesh Remodel v'+__version__,'Settings\n\nSelect the settings option\n',items,0,False,windowFlags)
         if ok and item == items[-1]:
@@ -413,13 +703,57 @@ Enter new sketch radius precision", prec, -1,12,1,flags=windowFlags)
             if ok:
                 pg.SetInt("SketchRadiusPrecision", new_prec)
         elif ok and item==items[5]:
-            new_coplanar_tol, ok = QtGui.QInputDialog.getDouble(window,"Coplanar tolerance", "Enter coplanar tolerance\n(Used when creating coplanar points.  Increase if some points are missing.)", coplanar_tol,.0000001,1,8)
+            new_coplanar_tol, ok = QtGui.QInputDialog.getDouble(window,"Coplanar tolerance", "Enter coplanar tolerance\n(Used when creating coplanar points.  Max distance of points from the plane.  Increase if some points are missing.)", coplanar_tol,.0000001,1,8)
             if ok:
                 pg.SetFloat("CoplanarTolerance", new_coplanar_tol)
         elif ok and item==items[6]:
             new_wireframe_tol, ok = QtGui.QInputDialog.getDouble(window,"Wireframe tolerance", "Enter wireframe tolerance\n(Used when creating wireframes to check if 2 points are the same.)", wireframe_tol,.0000001,1,8)
             if ok:
                 pg.SetFloat("WireFrameTolerance", new_wireframe_tol)
+        elif ok and item==items[7]:
+            pg.SetBool("LightweightPoints", True)
+        elif ok and item==items[8]:
+            pg.SetBool("LightweightPoints", False)
+        elif ok and item==items[9]:
+            new_weld_tol, ok = QtGui.QInputDialog.getDouble(window,"Weld tolerance", "Enter weld tolerance\n(Used when creating points objects.  Points closer than this are merged into one point.  0 = do not merge points.)", weld_tol,0,1000,8)
+            if ok:
+                pg.SetFloat("WeldTolerance", new_weld_tol)
+        elif ok and item==items[11]:
+            new_crop_radius, ok = QtGui.QInputDialog.getDouble(window,"Crop radius", "Enter crop radius\n(Used with Alt+Click create points / wireframe object.  Radius of the spheres around the picked points.)", crop_radius,.0000001,100000,4)
+            if ok:
+                pg.SetFloat("CropRadius", new_crop_radius)
+        elif ok and item==items[12]:
+            new_feature_angle, ok = QtGui.QInputDialog.getDouble(window,"Feature angle", "Enter feature angle in degrees\n(Used with Shift+Click create wireframe object.  Edges where the facets meet at more than this angle are kept.)", feature_angle,0,180,2)
+            if ok:
+                pg.SetFloat("FeatureAngle", new_feature_angle)
+        elif ok and item==items[10]:
+            new_decimate_count, ok = QtGui.QInputDialog.getInt(window,"Decimated points count", "Enter decimated points count\n(Used to pick the initial VoxelSize when creating decimated points objects.)", decimate_count,100,100000000,1000,flags=windowFlags)
+            if ok:
+                pg.SetInt("DecimateCount", new_decimate_count)
+        elif ok and item==items[13]:
+            pg.SetBool("ChainWireFrameEdges", True)
+        elif ok and item==items[14]:
+            pg.SetBool("ChainWireFrameEdges", False)
+        elif ok and item==items[15]:
+            new_threads, ok = QtGui.QInputDialog.getInt(window,"Wireframe threads", "Enter number of threads\n(Used to find the edges of meshes with more than 1 million facets.  0 = one per cpu, 1 = do not split the work.)", threads,0,256,1,flags=windowFlags)
+            if ok:
+                pg.SetInt("WireFrameThreads", new_threads)
+        elif ok and item==items[16]:
+            pg.SetBool("CleanWireFrameFacets", True)
+        elif ok and item==items[17]:
+            pg.SetBool("CleanWireFrameFacets", False)
+        elif ok and item==items[18]:
+            pg.SetBool("ImproveSortedPoints", True)
+        elif ok and item==items[19]:
+            pg.SetBool("ImproveSortedPoints", False)
+        elif ok and item==items[20]:
+            new_plane_threshold, ok = QtGui.QInputDialog.getDouble(window,"Plane detection threshold", "Enter plane detection threshold\n(Used by Detect planes.  Max distance of points from a detected plane, also the Tolerance of the coplanar points objects made.)", plane_threshold,.0000001,1000,8)
+            if ok:
+                pg.SetFloat("PlaneThreshold", new_plane_threshold)
+        elif ok and item==items[21]:
+            new_plane_min_points, ok = QtGui.QInputDialog.getInt(window,"Plane detection min points", "Enter plane detection min points\n(Used by Detect planes.  Planes with fewer points than this are not kept, the search stops at the first one.)", plane_min_points,3,100000000,100,flags=windowFlags)
+            if ok:
+                pg.SetInt("PlaneMinPoints", new_plane_min_points)
         return
 
     def IsActive(self):
@@ -428,6 +762,148 @@ Enter new sketch radius precision", prec, -1,12,1,flags=windowFlags)
 #end settings class
 
 
+####################################################################################
+# Lightweight points object, coordinates only, no Part shapes
+
+class PointsObject:
+    """Points object holding only the coordinates of the points, no Part vertices are created.
+       The Points property is a vector list, which FreeCAD saves in binary form.
+       If Source is set the points are taken from it on recompute, but only rebuilt if the
+       fingerprint of the source points (or of the filter settings) has changed."""
+    def __init__(self,obj):
+        obj.addProperty("App::PropertyVectorList","Points","PointsObject","Coordinates of the points")
+        obj.addProperty("App::PropertyLink","Source","PointsObject","Mesh, points cloud, or points object the points are taken from, if any")
+        obj.addProperty("App::PropertyFloatConstraint","VoxelSize","PointsObject","Keep only one point per cube of this size, 0 = keep all points").VoxelSize = (0.0,0.0,float("inf"),0.1)
+        obj.addProperty("App::PropertyFloatConstraint","WeldTolerance","PointsObject","Merge source points closer than this, 0 = do not merge").WeldTolerance = (0.0,0.0,float("inf"),0.001)
+        obj.addProperty("App::PropertyPythonObject","Region","PointsObject","Region of interest the source points are cropped to, None = all points")
+        obj.addProperty("App::PropertyString","Fingerprint","PointsObject","Fingerprint of source points and settings the points were last built from")
+        obj.addProperty("App::PropertyInteger","Count","PointsObject","Number of points in this object")
+        obj.addProperty("App::PropertyString","Version","PointsObject","Version of MeshRemodel used to create this object").Version = __version__
+        obj.Region = None
+        obj.setEditorMode("Points",2) #hidden, table editor is too slow for millions of points
+        obj.setEditorMode("Region",2) #hidden
+        obj.setEditorMode("Fingerprint",2) #hidden
+        obj.setEditorMode("Count",1) #readonly
+        obj.setEditorMode("Version",1) #readonly
+        obj.Proxy = self
+
+    def execute(self,fp):
+        if fp.Source:
+            pts = gu.getCachedPointsArray(fp.Source) #only read again when the source points change
+            if getattr(self,"source",None) is not pts: #only hashed again when the source points change
+                self.source = pts
+                self.sourceFingerprint = gu.fingerprint(pts)
+            fingerprint = self.sourceFingerprint+json.dumps([fp.Region,fp.WeldTolerance,fp.VoxelSize])
+            if fingerprint != fp.Fingerprint: #skip the rebuild if nothing has changed
+                pts = gu.filterPoints(pts,fp.Region,fp.WeldTolerance,fp.VoxelSize)
+                fp.Points = [tuple(p) for p in pts.tolist()]
+                fp.Fingerprint = fingerprint
+        if fp.Count != len(fp.Points):
+            fp.Count = len(fp.Points)
+
+    def onChanged(self,fp,prop):
+        if prop == "Points":
+            self.array = None
+            self.index = None
+
+    def getArray(self,fp):
+        """Nx3 numpy array of the points, made once and kept until Points changes"""
+        if getattr(self,"array",None) is None:
+            self.array = gu.vectorsToArray(fp.Points)
+        return self.array
+
+    def getIndex(self,fp):
+        """PointIndex of the points, made once and kept until Points changes"""
+        if getattr(self,"index",None) is None:
+            self.index = gu.PointIndex(self.getArray(fp))
+        return self.index
+
+    def __getstate__(self):
+        return None
+
+    def __setstate__(self,state):
+        return None
+
+
+class PointsObjectVP:
+    """View Provider for lightweight Points object, all points are drawn with a single coin point set"""
+    def __init__(self, obj):
+        obj.addProperty("App::PropertyFloat","PointSize","Display Options","Point size").PointSize = 4.0
+        obj.addProperty("App::PropertyColor","PointColor","Display Options","Point color").PointColor = (0.1,0.1,0.1)
+        obj.Proxy = self
+
+    def attach(self, obj):
+        self.Object = obj.Object
+        self.coords = coin.SoCoordinate3()
+        self.drawStyle = coin.SoDrawStyle()
+        self.drawStyle.style = coin.SoDrawStyle.POINTS
+        self.drawStyle.pointSize = obj.PointSize
+        self.material = coin.SoMaterial()
+        self.material.diffuseColor = obj.PointColor[:3]
+        lightModel = coin.SoLightModel()
+        lightModel.model = coin.SoLightModel.BASE_COLOR
+        #Part's point set supports highlighting of the preselected / selected vertex
+        pointSet = coin.SoType.fromName("SoBrepPointSet").createInstance()
+        if not pointSet:
+            pointSet = coin.SoPointSet()
+        self.node = coin.SoSeparator()
+        self.node.addChild(lightModel)
+        self.node.addChild(self.material)
+        self.node.addChild(self.drawStyle)
+        self.node.addChild(self.coords)
+        self.node.addChild(pointSet)
+        obj.addDisplayMode(self.node,"Points")
+        self.updateData(obj.Object,"Points")
+
+    def updateData(self, fp, prop):
+        if prop == "Points" and hasattr(self,"coords"):
+            pts = fp.Proxy.getArray(fp).tolist() #kept by the proxy, no Vector made per point
+            self.coords.point.setNum(len(pts))
+            if pts:
+                self.coords.point.setValues(0,len(pts),pts)
+
+    def getDisplayModes(self,obj):
+        return ["Points"]
+
+    def getDefaultDisplayMode(self):
+        return "Points"
+
+    def setDisplayMode(self,mode):
+        return mode
+
+    def onChanged(self, vp, prop):
+        if not hasattr(self,"drawStyle"): #not attached yet
+            return
+        if prop == "PointSize":
+            self.drawStyle.pointSize = vp.PointSize
+        elif prop == "PointColor":
+            self.material.diffuseColor = vp.PointColor[:3]
+
+    def getElement(self, detail):
+        """picked point index -> "VertexN" sub element name, same naming as the Part compound"""
+        if detail and detail.isOfType(coin.SoPointDetail.getClassTypeId()):
+            detail = coin.cast(detail,"SoPointDetail")
+            return "Vertex"+str(detail.getCoordinateIndex()+1)
+        return ""
+
+    def getDetail(self, name):
+        """"VertexN" sub element name -> point detail, used for highlighting the selection"""
+        if name.startswith("Vertex"):
+            detail = coin.SoPointDetail()
+            detail.setCoordinateIndex(int(name[6:])-1)
+            return detail
+        return None
+
+    def getIcon(self):
+        return os.path.join(iconPath, 'CreatePointsObject.svg')
+
+    def __getstate__(self):
+        return None
+
+    def __setstate__(self,state):
+        return None
+
+# end lightweight points object
 ####################################################################################
 # Create the Mesh Remodel Points Object
 
@@ -443,6 +919,9 @@ class MeshRemodelCreatePointsObjectCommandClass(object):
             'ToolTip' : "Create the points object from selected Mesh or Points cloud object\n\
 (Ctrl + Click to make mesh partially transparent and non-selectable.\n\
 Non-selectability can be reversed in the mesh object's view tab in the property view.)\n\
+(Shift + Click to make a parametric decimated points object, one point per voxel, see VoxelSize property.)\n\
+(Alt + Click to use only the points in a region of interest: the bounding box of a 2nd selected object,\n\
+the side of a 2nd selected plane its normal points to, or spheres of crop radius around points picked on the mesh.)\n\
 "}
  
     def Activated(self):
@@ -450,22 +929,29 @@ Non-selectability can be reversed in the mesh object's view tab in the property
         doc = FreeCAD.ActiveDocument
         pg = FreeCAD.ParamGet("User parameter:Plugins/MeshRemodel")
         point_size = pg.GetFloat("PointSize",4.0)
-        QtGui.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        #no wait cursor, the Cancel button of the progress bar needs the normal one
         doc.openTransaction("Create points object")
 
-        pts=[]
-        if hasattr(self.mesh,"Mesh"):
-            meshpts = self.mesh.Mesh.Points
-            for m in meshpts:
-                p = Part.Point(m.Vector)
-                pts.append(p.toShape())
-        elif hasattr(self.mesh,"Points") and hasattr(self.mesh.Points,"Points"): #points cloud
-            meshpts = self.mesh.Points.Points
-            for m in meshpts:
-                p = Part.Point(m)
-                pts.append(p.toShape())
-
-        Part.show(Part.makeCompound(pts),"MR_Points")
+        region = None
+        if modifiers == QtCore.Qt.AltModifier:
+            region = gu.getRegion(Gui.Selection.getSelectionEx())
+        if modifiers == QtCore.Qt.ShiftModifier:
+            self.makeDecimated(point_size)
+            doc.commitTransaction()
+            doc.recompute()
+            return
+        weld_tol = pg.GetFloat("WeldTolerance",0.0)
+        if pg.GetBool("LightweightPoints",True):
+            #parametric, the points are taken from the mesh on recompute
+            obj = doc.addObject("App::FeaturePython","MR_Points")
+            PointsObject(obj)
+            PointsObjectVP(obj.ViewObject)
+            obj.Region = json.loads(json.dumps(region)) #as it comes back from a saved file, tuples become lists
+            obj.WeldTolerance = weld_tol
+            obj.Source = self.mesh
+        else:
+            pts = gu.filterPoints(gu.getPointsArray(self.mesh),region,weld_tol)
+            Part.show(gu.makePointsCompound(pts),"MR_Points")
         doc.ActiveObject.ViewObject.PointSize = point_size
         doc.recompute()
         if modifiers == QtCore.Qt.ControlModifier:
@@ -473,16 +959,30 @@ Non-selectability can be reversed in the mesh object's view tab in the property
             self.mesh.ViewObject.Selectable = False
         doc.commitTransaction()
         doc.recompute()
-        QtGui.QApplication.restoreOverrideCursor()
         return
 
+    def makeDecimated(self, point_size):
+        """make parametric decimated points object from self.mesh"""
+        doc = FreeCAD.ActiveDocument
+        pg = FreeCAD.ParamGet("User parameter:Plugins/MeshRemodel")
+        target = pg.GetInt("DecimateCount",50000)
+        obj = doc.addObject("App::FeaturePython","MR_Decimated_Points")
+        PointsObject(obj)
+        PointsObjectVP(obj.ViewObject)
+        obj.ViewObject.PointSize = point_size
+        obj.VoxelSize = gu.voxelSizeForCount(gu.getCachedPointsArray(self.mesh),target) #kept for the recompute
+        obj.Source = self.mesh
+        if not hasattr(self.mesh,"Mesh"): #leave the mesh visible, hide the full resolution points
+            self.mesh.ViewObject.Visibility = False
+        FreeCAD.Console.PrintMessage("MeshRemodel: "+obj.Name+" VoxelSize = "+str(obj.VoxelSize)+" (about "+str(target)+" points)\n")
+
     def IsActive(self):
         if not FreeCAD.ActiveDocument:
             return False
         sel = Gui.Selection.getSelectionEx()
         if len(sel) == 0:
             return False
-        elif "Mesh.Feature" not in str(type(sel[0].Object)) and not hasattr(sel[0].Object,"Points") and not hasattr(sel[0].Object.Points,"Points"):
+        elif "Mesh.Feature" not in str(type(sel[0].Object)) and not hasattr(sel[0].Object,"Points"):
             return False
         else:
             self.mesh = sel[0].Object
@@ -490,6 +990,110 @@ Non-selectability can be reversed in the mesh object's view tab in the property
 
 # end create points class
 ####################################################################################
+# Lightweight wireframe object, shared points and edge indices, no Part shapes
+
+class WireFrameObject(PointsObject):
+    """WireFrame object holding the points and pairs of indices into the points, one pair per edge.
+       The pairs are kept as (a,b,-1) vectors, so they are saved in binary form like the points.
+       Part edges are only made for edges that get selected (see gu.getSubObjects())"""
+    def __init__(self,obj):
+        obj.addProperty("App::PropertyVectorList","Points","WireFrameObject","Coordinates of the points")
+        obj.addProperty("App::PropertyVectorList","Edges","WireFrameObject","Indices into Points of the 2 ends of each edge, as (a,b,-1)")
+        obj.addProperty("App::PropertyInteger","Count","WireFrameObject","Number of edges in this object")
+        obj.addProperty("App::PropertyString","Version","WireFrameObject","Version of MeshRemodel used to create this object").Version = __version__
+        obj.setEditorMode("Points",2) #hidden, table editor is too slow for millions of points
+        obj.setEditorMode("Edges",2) #hidden
+        obj.setEditorMode("Count",1) #readonly
+        obj.setEditorMode("Version",1) #readonly
+        obj.Proxy = self
+
+    def execute(self,fp):
+        if fp.Count != len(fp.Edges):
+            fp.Count = len(fp.Edges)
+
+    def onChanged(self,fp,prop):
+        if prop == "Points":
+            self.array = None
+            self.index = None
+        elif prop == "Edges":
+            self.edges = None
+
+    def getEdgesArray(self,fp):
+        """Kx2 numpy array of the edge indices, made once and kept until Edges changes"""
+        if getattr(self,"edges",None) is None:
+            self.edges = gu.vectorsToIndices(fp.Edges,2).reshape(-1,2)
+        return self.edges
+
+    def getEdge(self,fp,idx):
+        """Part edge for edge number idx (0-based)"""
+        a,b = self.getEdgesArray(fp)[idx]
+        pts = self.getArray(fp)
+        return Part.makeLine(tuple(pts[a]),tuple(pts[b]))
+
+
+class WireFrameObjectVP(PointsObjectVP):
+    """View Provider for lightweight WireFrame object, all edges are drawn with a single coin indexed line set
+       sharing the coordinates with the point set used for the vertices"""
+    def __init__(self, obj):
+        obj.addProperty("App::PropertyFloat","LineWidth","Display Options","Line width").LineWidth = 2.0
+        obj.addProperty("App::PropertyColor","LineColor","Display Options","Line color").LineColor = (0.1,0.1,0.1)
+        PointsObjectVP.__init__(self,obj)
+
+    def attach(self, obj):
+        PointsObjectVP.attach(self,obj)
+        self.lineStyle = coin.SoDrawStyle()
+        self.lineStyle.style = coin.SoDrawStyle.LINES
+        self.lineStyle.lineWidth = obj.LineWidth
+        self.lineMaterial = coin.SoMaterial()
+        self.lineMaterial.diffuseColor = obj.LineColor[:3]
+        #Part's line set supports highlighting of the preselected / selected edge
+        self.lineSet = coin.SoType.fromName("SoBrepEdgeSet").createInstance()
+        if not self.lineSet or not hasattr(self.lineSet,"coordIndex"):
+            self.lineSet = coin.SoIndexedLineSet()
+        lines = coin.SoSeparator()
+        lines.addChild(self.lineMaterial)
+        lines.addChild(self.lineStyle)
+        lines.addChild(self.lineSet)
+        self.node.insertChild(lines, self.node.findChild(self.coords)+1) #after coords, uses the same coordinates
+        self.updateData(obj.Object,"Edges")
+
+    def updateData(self, fp, prop):
+        PointsObjectVP.updateData(self, fp, prop)
+        if prop == "Edges" and hasattr(self,"lineSet"):
+            edges = gu.vectorsToIndices(fp.Edges,2).reshape(-1,2)
+            index = np.column_stack((edges, np.full(len(edges),-1))).ravel().tolist() #-1 ends each line
+            self.lineSet.coordIndex.setNum(len(index))
+            if index:
+                self.lineSet.coordIndex.setValues(0,len(index),index)
+
+    def onChanged(self, vp, prop):
+        PointsObjectVP.onChanged(self, vp, prop)
+        if not hasattr(self,"lineStyle"): #not attached yet
+            return
+        if prop == "LineWidth":
+            self.lineStyle.lineWidth = vp.LineWidth
+        elif prop == "LineColor":
+            self.lineMaterial.diffuseColor = vp.LineColor[:3]
+
+    def getElement(self, detail):
+        """picked line index -> "EdgeN", picked point index -> "VertexN", same naming as the Part compound"""
+        if detail and detail.isOfType(coin.SoLineDetail.getClassTypeId()):
+            detail = coin.cast(detail,"SoLineDetail")
+            return "Edge"+str(detail.getLineIndex()+1)
+        return PointsObjectVP.getElement(self, detail)
+
+    def getDetail(self, name):
+        if name.startswith("Edge"):
+            detail = coin.SoLineDetail()
+            detail.setLineIndex(int(name[4:])-1)
+            return detail
+        return PointsObjectVP.getDetail(self, name)
+
+    def getIcon(self):
+        return os.path.join(iconPath, 'CreateWireFrameObject.svg')
+
+# end lightweight wireframe object
+####################################################################################
 # Create the Mesh Remodel WireFrame Object
 
 class MeshRemodelCreateWireFrameObjectCommandClass(object):
@@ -509,17 +1113,11 @@ class MeshRemodelCreateWireFrameObjectCommandClass(object):
             'MenuText': "Create Wire&Frame object" ,
             'ToolTip' : fixTip("Create the WireFrame object\n\
 (Ctrl + Click to make mesh partially transparent and non-selectable.\n\
-Non-selectability can be reversed in the mesh object's view tab in the property view.)\n")}
-
-    def makeId(self,a,b):
-        """makeId(a,b)
-           make a unique id from 2 integers using the Cantor Pairing Function
-           see https://en.wikipedia.org/wiki/Pairing_function#Cantor_pairing_function
-        """
-        if a >= b:
-            return (a + b) * (a + b + 1) / 2 + a
-        else:
-            return (a + b) * (a + b + 1) / 2 + b
+Non-selectability can be reversed in the mesh object's view tab in the property view.)\n\
+(Alt + Click to use only the facets in a region of interest: the bounding box of a 2nd selected object,\n\
+the side of a 2nd selected plane its normal points to, or spheres of crop radius around points picked on the mesh.)\n\
+(Shift + Click for feature edges only: boundary and non-manifold edges and edges where the facets meet\n\
+at more than the feature angle, see settings.  Alt + Shift + Click for feature edges in the region of interest.)\n")}
 
     def Activated(self):
         modifiers = QtGui.QApplication.keyboardModifiers()
@@ -528,47 +1126,55 @@ Non-selectability can be reversed in the mesh object's view tab in the property
         line_width = pg.GetFloat("LineWidth",5.0)
         point_size = pg.GetFloat("PointSize",4.0)
         tolerance = pg.GetFloat("WireFrameTolerance",.01)
+        feature_angle = pg.GetFloat("FeatureAngle",30.0)
+        bClean = pg.GetBool("CleanWireFrameFacets",True)
         #QtGui.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
-        mids = []
-        lines=[]
-        meshfacets = self.mesh.Mesh.Facets
-        total = len(meshfacets)
-        pb = gu.MRProgress()
-        pb.makeProgressBar(total,"Cancel","Cancel Wireframe generation")
-
-        idMap = {}
-        for f in meshfacets:
-            try:
-                pts = f.Points
-                (id0,id1,id2) = f.PointIndices
-                if gu.isSamePoint(pts[0], pts[1], tolerance) or gu.isSamePoint(pts[0],pts[2],tolerance) or gu.isSamePoint(pts[1],pts[2],tolerance):
-                    continue #otherwise we get an exception, so skip this line
-                id = self.makeId(id0,id1)
-                if not idMap.get(id):
-                    l = Part.makeLine(pts[0],pts[1])
-                    lines.append(l)
-                    idMap[id] = id
-                id = self.makeId(id0,id2)
-                if not idMap.get(id):
-                    l = Part.makeLine(pts[0],pts[2])
-                    lines.append(l)
-                    idMap[id] = id
-                id = self.makeId(id2,id1)
-                if not idMap.get(id):
-                    l = Part.makeLine(pts[2],pts[1])
-                    lines.append(l)
-                    idMap[id] = id
-            except:
-                FreeCAD.Console.PrintError("Exception creating wireframe.  Typically this is caused by defective mesh object.\n")
-                pb.killProgressBar()
-            if pb.isCanceled():
-                FreeCAD.Console.PrintWarning("MeshRemodel: WireFrame creation canceled.  WireFrame may be incomplete.\n")
-                break
+        vecs, facets = self.mesh.Mesh.Topology
+        pts = gu.vectorsToArray(vecs)
+        facets = np.array(facets, dtype=np.int64).reshape(-1,3)
+        short, flat, duplicate = gu.facetDefects(pts,facets,tolerance)
+        if short.any() or flat.any() or duplicate.any():
+            FreeCAD.Console.PrintWarning("MeshRemodel: "+self.mesh.Label+" has "+str(int(short.sum()))+" facets with edges shorter than wireframe tolerance, "\
++str(int(flat.sum()))+" zero area facets and "+str(int(duplicate.sum()))+" duplicate facets"+("", ", skipping them")[bClean]+"\n")
+            if bClean:
+                facets = facets[~(short | flat | duplicate)]
+        bFeatures = modifiers == QtCore.Qt.ShiftModifier or modifiers == QtCore.Qt.ShiftModifier.__or__(QtCore.Qt.AltModifier)
+        if modifiers == QtCore.Qt.AltModifier or modifiers == QtCore.Qt.AltModifier.__or__(QtCore.Qt.ShiftModifier):
+            region = gu.getRegion(Gui.Selection.getSelectionEx())
+            if region:
+                inside = gu.regionMask(pts,region)
+                facets = facets[inside[facets].all(axis=1)] #keep facets with all 3 points inside
+                FreeCAD.Console.PrintMessage("MeshRemodel: "+str(len(facets))+" facets in the region of interest\n")
+        if bFeatures:
+            edges = gu.featureEdges(pts,facets,feature_angle)
+            FreeCAD.Console.PrintMessage("MeshRemodel: "+str(len(edges))+" feature edges\n")
+        elif len(facets) > 1000000 and pg.GetInt("WireFrameThreads",0) != 1:
+            edges = gu.parallelUniqueEdges(facets,pg.GetInt("WireFrameThreads",0))
+            if edges is None:
                 return
-        pb.killProgressBar()
+        else:
+            edges = gu.uniqueEdges(facets)
+        lengths = gu.edgeLengths(pts,edges)
+        edges = edges[(lengths >= tolerance) & (lengths > 0)] #Part.makeLine() fails on zero length
+        bLightweight = pg.GetBool("LightweightPoints",True)
+        if not bLightweight:
+            if pg.GetBool("ChainWireFrameEdges",True):
+                chains = gu.chainEdges(edges,True) #long paths through the junctions, not one wire per edge
+                FreeCAD.Console.PrintMessage("MeshRemodel: "+str(len(edges))+" edges chained into "+str(len(chains))+" polylines\n")
+                compound = gu.makePolylinesCompound(pts,chains)
+            else:
+                compound = gu.makeLinesCompound(pts,edges)
 
         doc.openTransaction("Create WireFrame object")
-        Part.show(Part.makeCompound(lines),"MR_WireFrame")
+        if bLightweight:
+            used, edges = np.unique(edges, return_inverse=True) #keep only points used by the edges
+            obj = doc.addObject("App::FeaturePython","MR_WireFrame")
+            WireFrameObject(obj)
+            WireFrameObjectVP(obj.ViewObject)
+            obj.Points = [tuple(p) for p in pts[used].tolist()]
+            obj.Edges = gu.indicesToVectors(edges,2)
+        else:
+            Part.show(compound,"MR_WireFrame")
         doc.ActiveObject.ViewObject.PointSize = point_size
         doc.ActiveObject.ViewObject.LineWidth = line_width
         if modifiers == QtCore.Qt.ControlModifier:
@@ -594,6 +1200,68 @@ Non-selectability can be reversed in the mesh object's view tab in the property
 
 # end create WireFrame class
 ####################################################################################
+# Create closed wires from the boundary loops of a mesh
+
+class MeshRemodelCreateBoundaryLoopsCommandClass(object):
+    """Create Boundary Loops command"""
+
+    def __init__(self):
+        self.mesh = None
+
+    def GetResources(self):
+        return {'Pixmap'  : os.path.join( iconPath , 'CreateBoundaryLoops.svg') ,
+            'MenuText': "Create &boundary loops" ,
+            'ToolTip' : fixTip("Create a wire for each boundary loop of the selected mesh\n\
+(The rims of holes and open edges, made of the edges used by only one facet.)\n\
+(Closed loops become closed wires, ready to use with Part Extrude or Loft.)\n\
+(Ctrl + Click to make mesh partially transparent and non-selectable.)\n")}
+
+    def Activated(self):
+        modifiers = QtGui.QApplication.keyboardModifiers()
+        doc = FreeCAD.ActiveDocument
+        pg = FreeCAD.ParamGet("User parameter:Plugins/MeshRemodel")
+        line_width = pg.GetFloat("LineWidth",5.0)
+        point_size = pg.GetFloat("PointSize",4.0)
+        vecs, facets = self.mesh.Mesh.Topology
+        pts = gu.vectorsToArray(vecs)
+        edges = gu.boundaryEdges(facets)
+        if len(edges) == 0:
+            FreeCAD.Console.PrintMessage("MeshRemodel: "+self.mesh.Label+" has no boundary edges (it is closed).\n")
+            return
+        chains = gu.chainEdges(edges)
+        chains.sort(key=len, reverse=True) #largest loop first
+        closed = sum(1 for c in chains if c[0] == c[-1])
+        FreeCAD.Console.PrintMessage("MeshRemodel: "+str(len(edges))+" boundary edges, "+str(closed)+" closed loops")
+        if closed < len(chains):
+            FreeCAD.Console.PrintMessage(", "+str(len(chains) - closed)+" open chains (boundary points shared by more than 2 boundary edges)")
+        FreeCAD.Console.PrintMessage("\n")
+        doc.openTransaction("Create boundary loops")
+        for chain in chains:
+            wire = Part.makePolygon([FreeCAD.Vector(*p) for p in pts[chain].tolist()])
+            Part.show(wire,"MR_Boundary_Loop")
+            doc.ActiveObject.ViewObject.PointSize = point_size
+            doc.ActiveObject.ViewObject.LineWidth = line_width
+        if modifiers == QtCore.Qt.ControlModifier:
+            self.mesh.ViewObject.Transparency = 75
+            self.mesh.ViewObject.Selectable = False
+        doc.recompute()
+        doc.commitTransaction()
+        return
+
+    def IsActive(self):
+        if not FreeCAD.ActiveDocument:
+            return False
+        sel = Gui.Selection.getSelectionEx()
+        if len(sel) == 0:
+            return False
+        elif "Mesh.Feature" not in str(type(sel[0].Object)):
+            return False
+        else:
+            self.mesh = sel[0].Object
+        return True
+
+# end create boundary loops class
+####################################################################################
 # Create the Mesh Cross Sections Object
 
 class MeshRemodelCreateCrossSectionsCommandClass(object):
@@ -827,6 +1495,15 @@ class MeshRemodelCreatePointObjectCommandClass(object):
         if not FreeCAD.ActiveDocument:
             return False
         selobj = Gui.Selection.getSelectionEx()
+        if selobj and not hasattr(selobj[0].Object,"Shape"): #lightweight points or wireframe object has no subobjects
+            names = selobj[0].SubElementNames
+            if len(names) == 1 and "Vertex" in names[0]:
+                self.obj = gu.getVertexPoint(selobj[0].Object,names[0])
+                return True
+            if len(names) == 1 and "Edge" in names[0] and len(selobj[0].PickedPoints) == 1:
+                self.obj = selobj[0].PickedPoints[0]
+                return True
+            return False
         if selobj:
             sel = selobj[0].SubObjects
             if len(sel) != 1:
@@ -850,7 +1527,9 @@ class CoplanarPoints:
         obj.addExtension("Part::AttachExtensionPython") #make attachable, why not?
         obj.addProperty("App::PropertyVectorList","Points","CoplanarPoints","Not readonly, but they will be updated with each recompute")
         obj.addProperty("App::PropertyLinkSubList","Trio","CoplanarPoints","3 points that define the plane")
-        obj.addProperty("App::PropertyFloatConstraint","Tolerance","CoplanarPoints","Bigger means more points can be included, Zero = include all points").Tolerance = (0.3,0.0,float("inf"),0.1)
+        obj.addProperty("App::PropertyFloatConstraint","Tolerance","CoplanarPoints","Max distance of points from the plane, bigger means more points can be included, Zero = include all points").Tolerance = (0.3,0.0,float("inf"),0.1)
+        obj.addProperty("App::PropertyBool","ToleranceIsDistance","CoplanarPoints","Tolerance is a distance (older versions used a volume)").ToleranceIsDistance = True
+        obj.setEditorMode("ToleranceIsDistance",2) #hidden
         obj.addProperty("App::PropertyLink","BasePointsObject","CoplanarPoints","The base points object from which these coplanar points are selected")
         obj.addProperty("App::PropertyFloat","PointSize","CoplanarPoints","Point size taken from settings")
         obj.addProperty("App::PropertyBool","ExplodeCompound","Triggers","Whether to explode compound of points shapes").ExplodeCompound = False
@@ -860,17 +1539,27 @@ class CoplanarPoints:
         obj.Proxy = self
         self.inhibitRecomputes = False
 
-    def makeSketch(self,fp):
+    def getTrio(self,fp):
+        """returns the 3 vectors of the Trio vertices"""
+        return [gu.getVertexPoint(fp.Trio[0][0],vertName) for vertName in fp.Trio[0][1]]
+
+    def makeSketch(self,fp,source=None):
+        """source is the object with the vertices to link to, fp itself if None"""
+        source = source if source else fp
         doc = FreeCAD.ActiveDocument
         sketch=doc.addObject("Sketcher::SketchObject","Sketch")
         trio = []
         #for vertName in fp.Trio[0][1]:
         #    trio.append(fp.Trio[0][0].Shape.Vertexes[int(vertName[6:])-1].Point)
-        sketch.Support = fp.Trio
-        sketch.MapMode = "ThreePointsPlane"
-        for ii in range(0,len(fp.Shape.Vertexes)):
+        if hasattr(fp.Trio[0][0],"Shape"):
+            sketch.Support = fp.Trio
+            sketch.MapMode = "ThreePointsPlane"
+        else: #lightweight points object, nothing to attach to
+            trio = self.getTrio(fp)
+            sketch.Placement = gu.planePlacement(trio[0],trio[1],trio[2])
+        for ii in range(0,len(source.Shape.Vertexes)):
             vname = 'Vertex'+str(ii+1)
-            sketch.addExternal(fp.Name, vname)
+            sketch.addExternal(source.Name, vname)
 
     def explodeCompound(self,fp):
         doc = FreeCAD.ActiveDocument
@@ -889,45 +1578,41 @@ class CoplanarPoints:
         if self.inhibitRecomputes:
             self.inhibitRecomputes = False;
             return
-        doc = FreeCAD.ActiveDocument
         #QtGui.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
-        candidates = []
+        trio = self.getTrio(fp)
+        if len(trio) != 3:
+            FreeCAD.Console.PrintError("MeshRemodel: Cannot make plane without 3 named subobjects.  Cannot simply use picked points.\n")
+            return
+        normal = trio[1].sub(trio[0]).cross(trio[2].sub(trio[0]))
+        if normal.Length == 0:
+            FreeCAD.Console.PrintError("MeshRemodel: Cannot make plane, the 3 trio points are colinear.\n")
+            return
+        candidates = np.zeros((0,3))
         if fp.BasePointsObject:
-            candidates = fp.BasePointsObject.Shape.Vertexes
-        coplanar = []
-        trio = []
-        for vertName in fp.Trio[0][1]:
-            trio.append(fp.Trio[0][0].Shape.Vertexes[int(vertName[6:])-1].Point)
+            candidates = gu.getCachedPointsArray(fp.BasePointsObject) #only read again when the base points change
         if fp.Tolerance == 0:
             tolerance = float("inf")
         else:
             tolerance = fp.Tolerance
-        for v in candidates:
-            if gu.isCoplanar(trio,v.Point,tolerance):
-                planar = True
-            else:
-                planar = False
-            if planar:
-                coplanar.append(Part.Point(v.Point).toShape())
-        coplanar.extend([Part.Point(v).toShape() for v in trio])
-        if len(trio) != 3:
-            FreeCAD.Console.PrintError("MeshRemodel: Cannot attach plane without 3 named subobjects.  Cannot simply use picked points.")
-        else:
-            #add a part::plane and project all the points to it
-            plane = doc.addObject("Part::Plane","MR_Alignment_Plane")
-            plane.ViewObject.Transparency = 80
-            plane.Width = 10
-            plane.Length = 10
-            plane.Support = fp.Trio
-            plane.MapMode = 'ThreePointsPlane'
-            plane.ViewObject.Visibility = False
-            coplanar2 = gu.flattenPoints(coplanar,plane)
-            doc.removeObject(plane.Name)
+        coplanar = np.concatenate((candidates[gu.coplanarMask(candidates,trio,tolerance)], gu.vectorsToArray(trio)))
+        #project all the points to the plane of the trio, no document objects needed
+        coplanar2 = gu.makeVertexes(gu.flattenArray(coplanar,trio[0],normal))
         self.inhibitRecomputes = True
         fp.Points = [v.Point for v in coplanar2]
         fp.Shape = Part.makeCompound(coplanar2)
         fp.ViewObject.PointSize = fp.PointSize
 
+    def onDocumentRestored(self,fp):
+        if not hasattr(fp,"ToleranceIsDistance"): #made by an older version, convert volume tolerance to distance
+            trio = self.getTrio(fp)
+            area = trio[1].sub(trio[0]).cross(trio[2].sub(trio[0])).Length / 2.0
+            self.inhibitRecomputes = True
+            fp.addProperty("App::PropertyBool","ToleranceIsDistance","CoplanarPoints","Tolerance is a distance (older versions used a volume)").ToleranceIsDistance = True
+            fp.setEditorMode("ToleranceIsDistance",2) #hidden
+            if area > 0 and fp.Tolerance != 0:
+                fp.Tolerance = 3.0 * fp.Tolerance / area #tetrahedron volume = distance * area / 3
+            self.inhibitRecomputes = False
+
     def onChanged(self,fp,prop):
         #FreeCAD.Console.PrintMessage(prop+" changed\n")
         self.inhibitRecomputes = False
@@ -946,6 +1631,126 @@ class CoplanarPoints:
             self.inhibitRecomputes = True
 
 
+class CoplanarPointsTaskPanel:
+    """Task panel for tuning the Tolerance of a coplanar points object
+    the distances of all the base points from the plane are found and sorted once, then each
+    tolerance is a binary search and a slice, previewed as a single coin point set.
+    Tolerance is only changed, and the object recomputed, when OK is pressed"""
+    def __init__(self, fp):
+        self.fp = fp
+        self.arr = gu.getCachedPointsArray(fp.BasePointsObject) if fp.BasePointsObject else np.zeros((0,3))
+        self.order, self.distances = gu.distanceOrder(self.arr, fp.Proxy.getTrio(fp))
+        self.count = -1 #number of points now in the preview
+        self.steps = 1000 #slider positions, slider moves through the points sorted by distance
+
+        self.form = QtGui.QWidget()
+        self.form.setWindowTitle("Coplanar tolerance")
+        layout = QtGui.QVBoxLayout(self.form)
+        self.slider = QtGui.QSlider(QtCore.Qt.Horizontal)
+        self.slider.setRange(0, self.steps)
+        self.slider.setToolTip("Slide right to include points farther from the plane")
+        self.spin = QtGui.QDoubleSpinBox()
+        self.spin.setDecimals(8)
+        top = math.ceil(float(self.distances[-1]) * 1e8) / 1e8 if len(self.distances) else 0.0 #spin box has 8 decimals
+        self.spin.setRange(0, max(top, fp.Tolerance)) #a larger stored Tolerance is shown as it is, not clamped
+        self.spin.setSingleStep(0.001)
+        self.spin.setSpecialValueText("All points") #Tolerance = 0 means include all points
+        self.spin.setToolTip("Max distance of points from the plane")
+        self.label = QtGui.QLabel()
+        layout.addWidget(QtGui.QLabel("Tolerance:"))
+        layout.addWidget(self.spin)
+        layout.addWidget(self.slider)
+        layout.addWidget(self.label)
+
+        self.makePreview()
+        self.wasVisible = self.fp.ViewObject.Visibility #put back as it was when the panel closes
+        self.fp.ViewObject.hide()
+        self.spin.setValue(fp.Tolerance)
+        self.startValue = self.spin.value() #OK only writes Tolerance if the user changed this
+        self.onSpinChanged(fp.Tolerance)
+        self.slider.valueChanged.connect(self.onSliderChanged)
+        self.spin.valueChanged.connect(self.onSpinChanged)
+
+    def makePreview(self):
+        self.coords = coin.SoCoordinate3()
+        drawStyle = coin.SoDrawStyle()
+        drawStyle.style = coin.SoDrawStyle.POINTS
+        drawStyle.pointSize = self.fp.ViewObject.PointSize
+        material = coin.SoMaterial()
+        material.diffuseColor = (1.0,0.5,0.0)
+        pickStyle = coin.SoPickStyle()
+        pickStyle.style = coin.SoPickStyle.UNPICKABLE
+        self.preview = coin.SoSeparator()
+        for node in (pickStyle, material, drawStyle, self.coords, coin.SoPointSet()):
+            self.preview.addChild(node)
+        FreeCADGui.ActiveDocument.ActiveView.getSceneGraph().addChild(self.preview)
+
+    def removePreview(self):
+        if self.preview:
+            FreeCADGui.ActiveDocument.ActiveView.getSceneGraph().removeChild(self.preview)
+            self.preview = None
+
+    def countFor(self, tolerance):
+        """number of points within tolerance of the plane"""
+        if tolerance == 0:
+            return len(self.distances)
+        return int(np.searchsorted(self.distances, tolerance, side="right"))
+
+    def showCount(self, count):
+        if count != self.count:
+            self.count = count
+            pts = self.arr[self.order[:count]].tolist()
+            self.coords.point.setNum(count)
+            if pts:
+                self.coords.point.setValues(0,count,pts)
+        self.label.setText(str(count)+" of "+str(len(self.distances))+" points")
+
+    def onSliderChanged(self, value):
+        total = len(self.distances)
+        count = int(round(value * total / float(self.steps)))
+        tolerance = math.ceil(float(self.distances[count-1]) * 1e8) / 1e8 if count > 0 else 0.0 #spin box has 8 decimals
+        if count == 0 and total:
+            #no points, but not 0, which means all of them, and at least the smallest step of the spin box
+            tolerance = max(math.floor(float(self.distances[0]) / 2.0 * 1e8) / 1e8, 1e-8)
+            count = self.countFor(tolerance) #points right on the plane are still in
+        if count == total:
+            tolerance = 0.0
+        self.spin.blockSignals(True)
+        self.spin.setValue(tolerance)
+        self.spin.blockSignals(False)
+        self.showCount(count)
+
+    def onSpinChanged(self, tolerance):
+        count = self.countFor(tolerance)
+        total = len(self.distances)
+        self.slider.blockSignals(True)
+        self.slider.setValue(int(round(count * self.steps / float(total))) if total else 0)
+        self.slider.blockSignals(False)
+        self.showCount(count)
+
+    def accept(self):
+        self.removePreview()
+        self.fp.ViewObject.Visibility = self.wasVisible
+        tolerance = self.spin.value()
+        if tolerance != self.startValue:
+            doc = self.fp.Document
+            doc.openTransaction("Coplanar tolerance")
+            self.fp.Tolerance = tolerance
+            doc.commitTransaction()
+            doc.recompute()
+        FreeCADGui.ActiveDocument.resetEdit()
+        return True
+
+    def reject(self):
+        self.removePreview()
+        self.fp.ViewObject.Visibility = self.wasVisible
+        FreeCADGui.ActiveDocument.resetEdit()
+        return True
+
+    def getStandardButtons(self):
+        return int(QtGui.QDialogButtonBox.Ok | QtGui.QDialogButtonBox.Cancel)
+
+
 class CoplanarPointsVP:
     """View Provider for Coplanar Points FP object"""
     def __init__(self, obj):
@@ -980,6 +1785,23 @@ class CoplanarPointsVP:
         '''Here we can do something when a single property got changed'''
         #FreeCAD.Console.PrintMessage("Change property: " + str(prop) + "\n")
 
+    def setEdit(self, vobj, mode=0):
+        '''Double click or Edit opens the tolerance task panel, other edit modes (e.g. Transform) are left to FreeCAD'''
+        if mode != 0:
+            return None
+        FreeCADGui.Control.showDialog(CoplanarPointsTaskPanel(vobj.Object))
+        return True
+
+    def unsetEdit(self, vobj, mode=0):
+        if mode != 0:
+            return None
+        FreeCADGui.Control.closeDialog()
+        return True
+
+    def doubleClicked(self, vobj):
+        vobj.Document.setEdit(vobj.Object.Name, 0)
+        return True
+
  
     def getIcon(self):
         '''Return the icon in XPM format which will appear in the tree view. This method is\
@@ -1077,6 +1899,134 @@ static char *_631571683001[] = {
         return None
 
 
+####################################################################################
+# Lightweight coplanar points object, indices into the base points, no Part shapes
+
+class CoplanarPointsObject(PointsObject):
+    """Coplanar points object holding only the indices of the coplanar points in the BasePointsObject,
+       3 to a vector, so they are saved in binary form.
+       The points are taken from the (cached) coordinates of the base and projected to the plane of the
+       Trio when needed, for drawing or selecting.  Part vertices are only made by the MakeSketch and
+       MakeCompound triggers, which need a shape to link to."""
+    def __init__(self,obj):
+        obj.addProperty("App::PropertyVectorList","Indices","CoplanarPoints","Indices of the coplanar points in the base points object, 3 to a vector")
+        obj.addProperty("App::PropertyLinkSubList","Trio","CoplanarPoints","3 points that define the plane")
+        obj.addProperty("App::PropertyFloatConstraint","Tolerance","CoplanarPoints","Max distance of points from the plane, bigger means more points can be included, Zero = include all points").Tolerance = (0.3,0.0,float("inf"),0.1)
+        obj.addProperty("App::PropertyLink","BasePointsObject","CoplanarPoints","The base points object from which these coplanar points are selected")
+        obj.addProperty("App::PropertyInteger","Count","CoplanarPoints","Number of points in this object")
+        obj.addProperty("App::PropertyBool","MakeSketch","Triggers","Whether to make a sketch and add points to it as external geometry links").MakeSketch = False
+        obj.addProperty("App::PropertyBool","MakeCompound","Triggers","Whether to make a Part compound of the points, for use where a shape is needed").MakeCompound = False
+        obj.addProperty("App::PropertyString","Version","CoplanarPoints","Version of MeshRemodel used to create this object").Version = __version__
+        obj.setEditorMode("Indices",2) #hidden, table editor is too slow for millions of points
+        obj.setEditorMode("Count",1) #readonly
+        obj.setEditorMode("Version",1) #readonly
+        obj.Proxy = self
+
+    getTrio = CoplanarPoints.getTrio
+    makeSketch = CoplanarPoints.makeSketch
+
+    def execute(self,fp):
+        trio = self.getTrio(fp)
+        if len(trio) != 3:
+            FreeCAD.Console.PrintError("MeshRemodel: Cannot make plane without 3 named subobjects.  Cannot simply use picked points.\n")
+            return
+        if trio[1].sub(trio[0]).cross(trio[2].sub(trio[0])).Length == 0:
+            FreeCAD.Console.PrintError("MeshRemodel: Cannot make plane, the 3 trio points are colinear.\n")
+            return
+        candidates = np.zeros((0,3))
+        if fp.BasePointsObject:
+            candidates = gu.getCachedPointsArray(fp.BasePointsObject)
+        tolerance = fp.Tolerance if fp.Tolerance != 0 else float("inf")
+        #set even if unchanged, the base points or the trio may have moved, so the points are drawn again
+        fp.Indices = gu.indicesToVectors(np.nonzero(gu.coplanarMask(candidates,trio,tolerance))[0])
+        count = len(self.getArray(fp))
+        if fp.Count != count:
+            fp.Count = count
+
+    def onChanged(self,fp,prop):
+        if prop in ("Indices","Trio","BasePointsObject"):
+            self.array = None
+            self.index = None
+        elif prop == "MakeSketch" and fp.MakeSketch == True:
+            self.makeSketch(fp,self.makeCompound(fp,False))
+            fp.MakeSketch = False
+        elif prop == "MakeCompound" and fp.MakeCompound == True:
+            self.makeCompound(fp)
+            fp.MakeCompound = False
+
+    def getArray(self,fp):
+        """Nx3 numpy array of the coplanar points projected to the plane of the trio, the trio points included
+        made from the base points once and kept until Indices, Trio or the base points change"""
+        if not fp.Trio or not fp.BasePointsObject: #not set yet or still being restored
+            return np.zeros((0,3))
+        base = gu.getCachedPointsArray(fp.BasePointsObject)
+        if getattr(self,"array",None) is None or self.base is not base:
+            trio = self.getTrio(fp)
+            normal = trio[1].sub(trio[0]).cross(trio[2].sub(trio[0]))
+            indices = gu.vectorsToIndices(fp.Indices)
+            indices = indices[indices < len(base)] #base has fewer points now, until the next recompute
+            self.array = gu.flattenArray(np.concatenate((base[indices], gu.vectorsToArray(trio))), trio[0], normal)
+            self.base = base
+            self.index = None
+        return self.array
+
+    def makeCompound(self,fp,visible=True):
+        """make a Part compound of the points, returns the new object"""
+        doc = fp.Document
+        doc.openTransaction("Make coplanar compound")
+        comp = doc.addObject("Part::Feature","MR_Coplanar_Compound")
+        comp.Shape = Part.makeCompound(gu.makeVertexes(self.getArray(fp)))
+        comp.ViewObject.PointSize = fp.ViewObject.PointSize
+        comp.ViewObject.Visibility = visible
+        doc.commitTransaction()
+        doc.recompute()
+        return comp
+
+
+class CoplanarPointsObjectVP(PointsObjectVP):
+    """View Provider for lightweight coplanar points object, drawn with a single coin point set
+       from the projected base points"""
+    def attach(self, obj):
+        PointsObjectVP.attach(self,obj)
+        self.updateData(obj.Object,"Indices")
+
+    def updateData(self, fp, prop):
+        if prop == "Indices" and hasattr(self,"coords"):
+            pts = fp.Proxy.getArray(fp).tolist()
+            self.coords.point.setNum(len(pts))
+            if pts:
+                self.coords.point.setValues(0,len(pts),pts)
+
+    setEdit = CoplanarPointsVP.setEdit
+    unsetEdit = CoplanarPointsVP.unsetEdit
+    doubleClicked = CoplanarPointsVP.doubleClicked
+
+    def getIcon(self):
+        return os.path.join(iconPath, 'CreateCoplanar.svg')
+
+# end lightweight coplanar points object
+####################################################################################
+
+def makeCoplanarPoints(base, trioObj, vertexNames, tolerance, point_size):
+    """make a coplanar points object in the active document, lightweight or Part compound according to settings
+    base is the points object to select from, the plane is defined by the 3 vertexNames of trioObj"""
+    doc = FreeCAD.ActiveDocument
+    pg = FreeCAD.ParamGet("User parameter:Plugins/MeshRemodel")
+    if pg.GetBool("LightweightPoints",True): #indices into the base points only
+        cp = doc.addObject("App::FeaturePython","MR_Coplanar_Points")
+        CoplanarPointsObject(cp)
+        CoplanarPointsObjectVP(cp.ViewObject)
+        cp.ViewObject.PointSize = point_size
+    else:
+        cp = doc.addObject("Part::FeaturePython","MR_Coplanar_Points")
+        CoplanarPoints(cp)
+        CoplanarPointsVP(cp.ViewObject)
+        cp.PointSize = point_size
+    cp.BasePointsObject = base
+    cp.Tolerance = tolerance
+    cp.Trio = (trioObj,vertexNames)
+    return cp
+
 class MeshRemodelCreateCoplanarPointsObjectCommandClass(object):
     """Create coplanar points object from 3 selected points"""
 
@@ -1102,16 +2052,14 @@ Uses internal coplanar check, (see settings -- Coplanar tolerance)\
         doc = FreeCAD.ActiveDocument
         pg = FreeCAD.ParamGet("User parameter:Plugins/MeshRemodel")
         point_size = pg.GetFloat("PointSize",4.0)
-        coplanar_tolerance = pg.GetFloat("CoplanarTolerance", .001)
+        coplanar_tolerance = pg.GetFloat("CoplanarTolerance", .01)
         doc.openTransaction("Create coplanar")
-        cp = doc.addObject("Part::FeaturePython","MR_Coplanar_Points")
-        CoplanarPoints(cp)
-        CoplanarPointsVP(cp.ViewObject)
-        cp.BasePointsObject = self.obj
-        cp.PointSize = point_size
-        cp.Tolerance = coplanar_tolerance
-        cp.Trio = (self.obj,self.vertexNames)
-        cp.BasePointsObject.ViewObject.Visibility = False
+        cp = makeCoplanarPoints(self.obj, self.obj, self.vertexNames, coplanar_tolerance, point_size)
+        if hasattr(self.obj,"VoxelSize") and self.obj.VoxelSize > 0 and self.obj.Source:
+            cp.BasePointsObject = self.obj.Source #trio picked on decimated points, but use full resolution points
+        if not hasattr(cp.BasePointsObject,"Mesh"):
+            cp.BasePointsObject.ViewObject.Visibility = False
+        self.obj.ViewObject.Visibility = False
         doc.commitTransaction()
         FreeCADGui.Selection.clearSelection()
         FreeCADGui.Selection.addSelection(doc.Name,cp.Name)
@@ -1135,7 +2083,7 @@ Uses internal coplanar check, (see settings -- Coplanar tolerance)\
                 for pt in s.PickedPoints:
                     self.pts.append(pt)
                     count += 1
-                if len(p)==0: #might be individual part point objects
+                if len(p)==0 and hasattr(s.Object,"Shape"): #might be individual part point objects
                     if len(s.Object.Shape.Vertexes)==1:
                         self.pts.append(s.Object.Shape.Vertexes[0].Point)
                         count += 1
@@ -1148,6 +2096,76 @@ Uses internal coplanar check, (see settings -- Coplanar tolerance)\
 
 # end create coplanar points object
 ####################################################################################
+# Detect planes in a points object
+
+class MeshRemodelDetectPlanesCommandClass(object):
+    """Detect the dominant planes of a points object, one coplanar points object per plane"""
+
+    def __init__(self):
+        self.obj = None
+        self.sel = []
+
+    def GetResources(self):
+        return {'Pixmap'  : os.path.join( iconPath , 'DetectPlanes.svg') ,
+            'MenuText': "Detect &planes" ,
+            'ToolTip' : fixTip("Detect the dominant planes of the selected points object with RANSAC\n\
+and make a coplanar points object for each one, largest plane first\n\
+(See settings -- Plane detection threshold and Plane detection min points)\n\
+(Alt+Click to only search the region of interest: the side of a selected plane,\n\
+the bounding box of another selected object, or spheres of Crop radius around picked points)\n")}
+
+    def Activated(self):
+        modifiers = QtGui.QApplication.keyboardModifiers()
+        doc = FreeCAD.ActiveDocument
+        pg = FreeCAD.ParamGet("User parameter:Plugins/MeshRemodel")
+        point_size = pg.GetFloat("PointSize",4.0)
+        threshold = pg.GetFloat("PlaneThreshold",0.1)
+        min_points = pg.GetInt("PlaneMinPoints",500)
+        max_planes = pg.GetInt("PlaneMaxCount",20)
+        arr = gu.getCachedPointsArray(self.obj)
+        ids = np.arange(len(arr))
+        index = None
+        if modifiers == QtCore.Qt.AltModifier:
+            region = gu.getRegion(self.sel)
+            if region:
+                ids = ids[gu.regionMask(arr,region)]
+                FreeCAD.Console.PrintMessage("MeshRemodel: "+str(len(ids))+" points in the region of interest\n")
+        if len(ids) == len(arr): #all points, the object's index is kept for next time
+            index = gu.getPointIndex(self.obj)
+        pb = gu.MRProgress()
+        pb.makeProgressBar(max_planes,"Cancel","Cancel plane detection",0)
+        planes = gu.ransacPlanes(arr[ids], threshold, min_points, max_planes, progress=lambda found, total: pb.isCanceled(), index=index)
+        pb.killProgressBar()
+        if not planes:
+            FreeCAD.Console.PrintMessage("MeshRemodel: no planes with at least "+str(min_points)+" points found in "+self.obj.Label+"\n")
+            return
+        doc.openTransaction("Detect planes")
+        for trio, inliers in planes:
+            names = ["Vertex"+str(ids[ii]+1) for ii in trio]
+            makeCoplanarPoints(self.obj, self.obj, names, threshold, point_size)
+            FreeCAD.Console.PrintMessage("MeshRemodel: plane through "+", ".join(names)+" with "+str(len(inliers))+" points\n")
+        self.obj.ViewObject.Visibility = False
+        doc.commitTransaction()
+        doc.recompute()
+        return
+
+    def IsActive(self):
+        if not FreeCAD.ActiveDocument:
+            return False
+        self.sel = Gui.Selection.getSelectionEx()
+        if len(self.sel) == 0:
+            return False
+        obj = self.sel[0].Object
+        if hasattr(obj,"Proxy") and hasattr(obj.Proxy,"getArray"): #lightweight points object
+            self.obj = obj
+            return True
+        if hasattr(obj,"Shape") and obj.Shape.ShapeType == "Compound": #points object made as a compound of vertices
+            self.obj = obj
+            return True
+        return False
+
+# end detect planes
+####################################################################################
 
 # Create a line from 2 selected points
 
@@ -1207,7 +2225,7 @@ class MeshRemodelCreateLineCommandClass(object):
         hasEdges = False
         for s in sel:
             if s.HasSubObjects and "Edge" in s.SubElementNames[0]:
-                for sub in s.SubObjects:
+                for sub in gu.getSubObjects(s):
                     if "Edge" in str(type(sub)):
                         self.pts.append(sub.firstVertex().Point)
                         self.pts.append(sub.lastVertex().Point)
@@ -1264,7 +2282,7 @@ or all points, but not a combination of the 2 object types\n\
                 self.pts.append(self.pts[0]) #don't close polygon on shift+click
 
         if modifiers == QtCore.Qt.AltModifier.__or__(QtCore.Qt.ShiftModifier) or modifiers == QtCore.Qt.AltModifier:
-            lineList = self.makePolygon(gu.sortPoints(self.pts))
+            lineList = self.makePolygon(gu.sortPoints(self.pts,pg.GetBool("ImproveSortedPoints",False)))
         else:
             lineList = self.makePolygon(self.pts)
 
@@ -1312,7 +2330,7 @@ or all points, but not a combination of the 2 object types\n\
         self.edges = []
         for s in sel:
             if s.HasSubObjects and "Edge" in s.SubElementNames[0]:
-                for sub in s.SubObjects:
+                for sub in gu.getSubObjects(s):
                     if "Edge" in str(type(sub)):
                         self.edges.append(sub)
                 count = len(self.edges)+1 #2 edges will work as well as 3 points
@@ -1322,7 +2340,7 @@ or all points, but not a combination of the 2 object types\n\
                 for pt in s.PickedPoints:
                     self.pts.append(pt)
                     count += 1
-                if len(p)==0: #might be individual part point objects
+                if len(p)==0 and hasattr(s.Object,"Shape"): #might be individual part point objects
                     if len(s.Object.Shape.Vertexes)==1:
                         self.pts.append(s.Object.Shape.Vertexes[0].Point)
                         count += 1
@@ -1361,7 +2379,7 @@ class MeshRemodelCreateBSplineCommandClass(object):
         if modifiers == QtCore.Qt.ShiftModifier or modifiers == QtCore.Qt.ShiftModifier.__or__(QtCore.Qt.AltModifier):
             is_periodic=False #don't close bspline on shift+click
         if modifiers == QtCore.Qt.AltModifier or modifiers == QtCore.Qt.AltModifier.__or__(QtCore.Qt.ShiftModifier) or modifiers == QtCore.Qt.ShiftModifier:
-            self.pts = gu.sortPoints(self.pts)[:-1]
+            self.pts = gu.sortPoints(self.pts,pg.GetBool("ImproveSortedPoints",False))[:-1]
         bs = Draft.makeBSpline(self.pts, is_periodic)
         bs.Label = "MR_BSpline"
         bs.ViewObject.LineWidth=line_width
@@ -1386,7 +2404,7 @@ class MeshRemodelCreateBSplineCommandClass(object):
                 for pt in s.PickedPoints:
                     self.pts.append(pt)
                     count += 1
-                if len(p)==0: #might be individual part point objects
+                if len(p)==0 and hasattr(s.Object,"Shape"): #might be individual part point objects
                     if len(s.Object.Shape.Vertexes)==1:
                         self.pts.append(s.Object.Shape.Vertexes[0].Point)
                         count += 1
@@ -1482,7 +2500,7 @@ class MeshRemodelCreateCircleCommandClass(object):
                 for pt in s.PickedPoints:
                     self.pts.append(pt)
                     count += 1
-                if len(p)==0: #might be individual part point objects
+                if len(p)==0 and hasattr(s.Object,"Shape"): #might be individual part point objects
                     if len(s.Object.Shape.Vertexes)==1:
                         self.pts.append(s.Object.Shape.Vertexes[0].Point)
                         count += 1
@@ -1577,7 +2595,7 @@ are not getting the arc orientation you were expecting -- will need to delete un
                 for pt in s.PickedPoints:
                     self.pts.append(pt)
                     count += 1
-                if len(p)==0: #might be individual part point objects
+                if len(p)==0 and hasattr(s.Object,"Shape"): #might be individual part point objects
                     if len(s.Object.Shape.Vertexes)==1:
                         self.pts.append(s.Object.Shape.Vertexes[0].Point)
                         count += 1
@@ -1794,9 +2812,8 @@ class MeshRemodelSelectionObserver():
             return
         if self.isVertexMode() and "Vertex" in str(sub):
             Gui.Selection.addSelection(doc,obj,str(sub))
-            idx = int(sub[6:])
             thisobj = FreeCAD.ActiveDocument.getObject(obj)
-            p = thisobj.Shape.Vertexes[idx-1].Point
+            p = gu.getVertexPoint(thisobj,str(sub))
             if not gu.hasPoint(p,global_picked,.0001):
                 global_picked.append(p)
 
@@ -1815,16 +2832,9 @@ class MeshRemodelSelectionObserver():
     def removeSelection(self,doc,obj,sub):                # Delete the selected object
         #FreeCAD.Console.PrintMessage("removeSelection"+ "\n")
         if self.isVertexMode() and "Vertex" in str(sub):
-            idx = int(sub[6:])
             thisobj = FreeCAD.ActiveDocument.getObject(obj)
-            p = thisobj.Shape.Vertexes[idx-1].Point
-            if gu.hasPoint(p, global_picked, .0001):
-                for ii in range(0,len(global_picked)):
-                    try:
-                        if gu.isSamePoint(global_picked[ii],p,.0001):
-                            global_picked.remove(global_picked[ii])
-                    except:
-                        pass
+            p = gu.getVertexPoint(thisobj,str(sub))
+            global_picked[:] = [q for q in global_picked if not gu.isSamePoint(q,p,.0001)] #in place, others hold it
         pass
 
     def setSelection(self,doc):                           # Selection in ComboView
@@ -1991,11 +3001,13 @@ def initialize():
     if FreeCAD.GuiUp:
         Gui.addCommand("MeshRemodelCreatePointsObject", MeshRemodelCreatePointsObjectCommandClass())
         Gui.addCommand("MeshRemodelCreateWireFrameObject",MeshRemodelCreateWireFrameObjectCommandClass())
+        Gui.addCommand("MeshRemodelCreateBoundaryLoops",MeshRemodelCreateBoundaryLoopsCommandClass())
         Gui.addCommand("MeshRemodelCreateCrossSectionsObject",MeshRemodelCreateCrossSectionsCommandClass())
         Gui.addCommand("MeshRemodelAddSelectionObserver",MeshRemodelAddSelectionObserverCommandClass())
         Gui.addCommand("MeshRemodelPartSolid",MeshRemodelPartSolidCommandClass())
         Gui.addCommand("MeshRemodelCreatePointObject", MeshRemodelCreatePointObjectCommandClass())
         Gui.addCommand("MeshRemodelCreateCoplanarPointsObject", MeshRemodelCreateCoplanarPointsObjectCommandClass())
+        Gui.addCommand("MeshRemodelDetectPlanes", MeshRemodelDetectPlanesCommandClass())
         Gui.addCommand("MeshRemodelCreateLine", MeshRemodelCreateLineCommandClass())
         Gui.addCommand("MeshRemodelCreatePolygon", MeshRemodelCreatePolygonCommandClass())
         Gui.addCommand("MeshRemodelCreateBSpline", MeshRemodelCreateBSplineCommandClass())
@@ -0,0 +1,1098 @@
+# -*- coding: utf-8 -*-
+###################################################################################
+#
+#  MeshRemodelGeomCore.py
+#  
+#  Copyright 2019 Mark Ganson <TheMarkster> mwganson at gmail
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#  
+#  
+###################################################################################
+
+# Numerical core of MeshRemodel: functions on plain numpy arrays (Nx3 points, Mx3 facet indices).
+# No FreeCAD, Part or GUI imports, so this can be used in headless batch jobs and benchmarks.
+# MeshRemodelGeomUtils in MeshRemodelCmd.py exposes all of these as gu.<name>().
+
+import os, math, itertools, hashlib
+import concurrent.futures
+import numpy as np
+
+######################################################################################
+# points
+
+def vectorsToArray(vecs):
+    """ vectorsToArray(vecs)
+        vecs is a list of vectors (or any objects with x,y,z attributes)
+        returns Nx3 numpy array of float64, filled in a single pass"""
+    n = len(vecs)
+    flat = np.fromiter(itertools.chain.from_iterable((v.x,v.y,v.z) for v in vecs), dtype=np.float64, count=3*n)
+    return flat.reshape(n,3)
+
+def indicesToVectors(indices, width=3):
+    """ indicesToVectors(indices, width=3)
+        indices is array of non-negative ints, width (1 to 3) of them go in each (x,y,z) tuple,
+        the rest of each tuple and of the last one is -1
+        returns list of tuples for an App::PropertyVectorList, which FreeCAD saves in binary form,
+        an App::PropertyIntegerList is saved as XML, one element per index"""
+    flat = np.asarray(indices, dtype=np.int64).ravel()
+    rows = -(-len(flat) // width)
+    padded = np.full(rows * width, -1, dtype=np.int64)
+    padded[:len(flat)] = flat
+    table = np.full((rows,3), -1.0)
+    table[:,:width] = padded.reshape(rows, width)
+    return [tuple(v) for v in table.tolist()]
+
+def vectorsToIndices(vecs, width=3):
+    """ vectorsToIndices(vecs, width=3)
+        vecs is a list of vectors made by indicesToVectors(indices, width)
+        returns the indices as a flat int64 array"""
+    flat = np.rint(vectorsToArray(vecs)[:,:width]).astype(np.int64).ravel()
+    return flat[flat >= 0]
+
+def firstUnique(arr, tol=0):
+    """ firstUnique(arr, tol=0)
+        arr is Nx3 array, duplicates are found by rounding the coordinates to multiples of tol
+        (or comparing them exactly if tol is 0) and hashing the 3 integers of each point into one
+        returns indices (ascending) of the first point of each group of duplicates"""
+    arr = np.ascontiguousarray(arr, dtype=np.float64).reshape(-1,3)
+    if len(arr) == 0:
+        return np.zeros(0, dtype=np.int64)
+    cells = np.round(arr / tol).astype(np.int64) if tol > 0 else (arr + 0.0).view(np.int64) #+0.0 so -0.0 == 0.0
+    with np.errstate(over="ignore"): #wrapping around is fine for a hash
+        keys = cells @ np.array([73856093, 19349663, 83492791], dtype=np.int64)
+    order = np.argsort(keys, kind="stable")
+    same = np.zeros(len(order), dtype=bool)
+    same[1:] = (keys[order[1:]] == keys[order[:-1]]) & (cells[order[1:]] == cells[order[:-1]]).all(axis=1)
+    return np.sort(order[~same])
+
+def gridCells(arr, cellSize):
+    """ gridCells(arr, cellSize)
+        arr is Nx3 array, cellSize is edge length of the cubes of a uniform grid
+        returns (keys, dims), keys is one integer per point, equal for points in the same cell
+        key + (dx*dims[1] + dy)*dims[2] + dz is the key of the neighbor cell at offset dx,dy,dz (-1,0,1)"""
+    cells = np.floor((arr - arr.min(axis=0)) / cellSize).astype(np.int64) + 1 #+1 so offset -1 cannot wrap
+    dims = cells.max(axis=0) + 2
+    if float(dims[0]) * float(dims[1]) * float(dims[2]) >= 2**62:
+        raise Exception("MeshRemodel GeomUtils Error: gridCells() cell size "+str(cellSize)+" is too small for the extent of the points\n")
+    keys = (cells[:,0] * dims[1] + cells[:,1]) * dims[2] + cells[:,2]
+    return keys, dims
+
+def weldPoints(arr, tol):
+    """ weldPoints(arr, tol)
+        arr is Nx3 array, tol is weld distance
+        points are taken in their original order, each one is merged into the nearest kept point
+        within tol, found in the 27 grid cells (cell size tol) around it, else it is kept itself,
+        so no point moves farther than tol and merges never chain along a row of close points
+        returns (indices, inverse): indices of the points of arr that are kept, in their original order,
+        and for each point of arr the index of its representative in arr[indices]"""
+    count = len(arr)
+    if count == 0 or tol <= 0:
+        return np.arange(count), np.arange(count)
+    keys, dims = gridCells(arr, tol)
+    offsets = np.array([(dx * dims[1] + dy) * dims[2] + dz for dx, dy, dz in itertools.product((-1,0,1), repeat=3)])
+    ukeys, cellOf, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    cellOf = cellOf.ravel()
+    occupied = np.empty((len(ukeys), len(offsets)), dtype=bool)
+    for n, offset in enumerate(offsets.tolist()):
+        nkeys = ukeys + offset
+        pos = np.minimum(np.searchsorted(ukeys, nkeys), len(ukeys)-1)
+        occupied[:,n] = ukeys[pos] == nkeys
+    #points alone in their 27 cells keep themselves, only the others need the loop below
+    crowded = np.nonzero((counts > 1) | (occupied.sum(axis=1) > 1))[0]
+    near = occupied[crowded]
+    rows, cols = np.nonzero(near)
+    nearKeys = (ukeys[crowded][rows] + offsets[cols]).tolist() #occupied cells around each crowded cell
+    ends = np.zeros(len(ukeys), dtype=np.int64)
+    ends[crowded] = np.cumsum(near.sum(axis=1))
+    starts = ends.copy()
+    starts[crowded] -= near.sum(axis=1)
+    rep = np.arange(count)
+    busy = np.nonzero(np.isin(cellOf, crowded))[0]
+    tol2 = tol * tol
+    repsIn = {} #cell key: [(index, x, y, z)] of the kept points in that cell
+    for i, (x, y, z), key, s, e in zip(busy.tolist(), arr[busy].tolist(), keys[busy].tolist(),
+                                       starts[cellOf[busy]].tolist(), ends[cellOf[busy]].tolist()):
+        best = -1
+        bestDist = tol2
+        for nkey in nearKeys[s:e]:
+            for j, a, b, c in repsIn.get(nkey, ()):
+                dist = (x-a)*(x-a) + (y-b)*(y-b) + (z-c)*(z-c)
+                if dist <= bestDist:
+                    best = j
+                    bestDist = dist
+        if best < 0:
+            repsIn.setdefault(key, []).append((i, x, y, z))
+        else:
+            rep[i] = best
+    kept = np.nonzero(rep == np.arange(count))[0]
+    rank = np.empty(count, dtype=np.int64)
+    rank[kept] = np.arange(len(kept))
+    return kept, rank[rep]
+
+def voxelDecimate(arr, voxelSize):
+    """ voxelDecimate(arr, voxelSize)
+        arr is Nx3 array, voxelSize is edge length of the voxels
+        returns indices (ascending) of one point per occupied voxel, the point nearest
+        the centroid of the voxel's points, so the kept points are still points of arr"""
+    if len(arr) == 0 or voxelSize <= 0:
+        return np.arange(len(arr))
+    cell = np.unique(gridCells(arr, voxelSize)[0], return_inverse=True)[1].ravel()
+    counts = np.bincount(cell)
+    centroids = np.column_stack([np.bincount(cell, weights=arr[:,ii]) for ii in range(3)]) / counts[:,None]
+    d = ((arr - centroids[cell])**2).sum(axis=1)
+    order = np.lexsort((d, cell)) #by voxel, then by distance to centroid
+    sortedCells = cell[order]
+    firsts = np.ones(len(order), dtype=bool)
+    firsts[1:] = sortedCells[1:] != sortedCells[:-1]
+    return np.sort(order[firsts])
+
+def voxelSizeForCount(arr, count):
+    """ voxelSizeForCount(arr, count)
+        estimate the voxel size for which voxelDecimate(arr, size) keeps about count points
+        assumes points are sampled from a surface, so the number of voxels goes as 1/size^2
+        returns 0 if arr already has count points or fewer"""
+    if len(arr) <= count:
+        return 0.0
+    diag = float(np.linalg.norm(arr.max(axis=0) - arr.min(axis=0)))
+    if diag == 0:
+        return 0.0
+    size = diag / math.sqrt(count)
+    for ii in range(3):
+        occupied = len(np.unique(gridCells(arr, size)[0]))
+        size *= math.sqrt(occupied / count)
+    return size
+
+def regionMask(arr, region):
+    """ regionMask(arr, region)
+        arr is Nx3 array, region is one of these tuples:
+        ("Box", (xmin,ymin,zmin), (xmax,ymax,zmax))
+        ("Sphere", [center1, center2, ...], radius) -- inside any of the spheres
+        ("HalfSpace", base, normal) -- on the side of the plane the normal points to
+        returns boolean array, True for the points of arr inside the region"""
+    kind = region[0]
+    if kind == "Box":
+        return np.all((arr >= np.array(region[1])) & (arr <= np.array(region[2])), axis=1)
+    elif kind == "Sphere":
+        mask = np.zeros(len(arr), dtype=bool)
+        for center in region[1]:
+            mask |= ((arr - np.array(center))**2).sum(axis=1) <= region[2]**2
+        return mask
+    elif kind == "HalfSpace":
+        return (arr - np.array(region[1])).dot(np.array(region[2])) >= 0
+    raise Exception("MeshRemodel GeomUtils Error: regionMask() unknown region type: "+str(kind)+"\n")
+
+def fingerprint(arr):
+    """ fingerprint(arr)
+        return string identifying the contents of arr: the number of points and a hash of the coordinates"""
+    arr = np.ascontiguousarray(arr, dtype=np.float64)
+    return str(len(arr))+":"+hashlib.blake2b(arr.tobytes(), digest_size=16).hexdigest()
+
+def filterPoints(arr, region=None, weldTolerance=0, voxelSize=0, report=None):
+    """ filterPoints(arr, region=None, weldTolerance=0, voxelSize=0, report=None)
+        arr is Nx3 array, crop to region (see regionMask()), then weld (see weldPoints()),
+        then decimate (see voxelDecimate()), skipping the steps that are not used
+        report is an optional function called with a message string after cropping and welding
+        returns the filtered array"""
+    if region:
+        arr = arr[regionMask(arr, region)]
+        if report:
+            report("MeshRemodel: "+str(len(arr))+" points in the region of interest\n")
+    if weldTolerance > 0:
+        kept = weldPoints(arr, weldTolerance)[0]
+        if report:
+            report("MeshRemodel: "+str(len(arr)-len(kept))+" of "+str(len(arr))+" points merged with weld tolerance "+str(weldTolerance)+"\n")
+        arr = arr[kept]
+    if voxelSize > 0:
+        arr = arr[voxelDecimate(arr, voxelSize)]
+    return arr
+
+######################################################################################
+# spatial index
+
+class PointIndex:
+    """uniform grid spatial index over an Nx3 array of points"""
+    def __init__(self, arr, cellSize=0):
+        """arr is Nx3 array of points, cellSize is edge length of the grid cubes
+        if cellSize is 0 it is picked for a few points per cell, assuming the points are on a surface"""
+        self.arr = np.asarray(arr, dtype=np.float64).reshape(-1,3)
+        count = len(self.arr)
+        self.alive = np.ones(count, dtype=bool)
+        self.origin = self.arr.min(axis=0) if count else np.zeros(3)
+        extent = self.arr.max(axis=0) - self.origin if count else np.zeros(3)
+        if cellSize <= 0:
+            cellSize = float(np.linalg.norm(extent)) / math.sqrt(max(count,1) / 4.0)
+        self.cellSize = cellSize if cellSize > 0 else 1.0
+        self.dims = np.floor(extent / self.cellSize).astype(np.int64) + 1
+        if float(self.dims[0]) * float(self.dims[1]) * float(self.dims[2]) >= 2**62:
+            raise Exception("MeshRemodel GeomUtils Error: PointIndex cell size "+str(cellSize)+" is too small for the extent of the points\n")
+        self.cells = self.cellOf(self.arr)
+        keys = self.cellKeys(self.cells)
+        self.order = np.argsort(keys, kind="stable") #point indices grouped by cell
+        self.keys, self.starts, counts = np.unique(keys[self.order], return_index=True, return_counts=True)
+        self.ends = self.starts + counts
+
+    def cellOf(self, pts):
+        return np.floor((np.asarray(pts, dtype=np.float64) - self.origin) / self.cellSize).astype(np.int64)
+
+    def cellKeys(self, cells):
+        return (cells[...,0] * self.dims[1] + cells[...,1]) * self.dims[2] + cells[...,2]
+
+    def remove(self, idx):
+        """idx is index or array of indices of points to leave out of all further queries"""
+        self.alive[idx] = False
+
+    def shellOffsets(self, ring):
+        """cell offsets at exactly ring cells away, the 6 faces of a cube without overlapping edges and corners
+        made once per ring and kept"""
+        if not hasattr(self, "offsetCache"):
+            self.offsetCache = {0: np.zeros((1,3), dtype=np.int64)}
+        if ring not in self.offsetCache:
+            full = np.arange(-ring, ring+1)
+            inner = np.arange(-ring+1, ring)
+            faces = []
+            for side in (-ring, ring):
+                faces.append(np.stack(np.meshgrid([side], full, full, indexing="ij"), axis=-1).reshape(-1,3))
+                faces.append(np.stack(np.meshgrid(inner, [side], full, indexing="ij"), axis=-1).reshape(-1,3))
+                faces.append(np.stack(np.meshgrid(inner, inner, [side], indexing="ij"), axis=-1).reshape(-1,3))
+            self.offsetCache[ring] = np.concatenate(faces)
+        return self.offsetCache[ring]
+
+    def shell(self, center, ring):
+        """indices of live points in the cells at exactly ring cells from center cell (in any axis)"""
+        cells = center + self.shellOffsets(ring)
+        cells = cells[((cells >= 0) & (cells < self.dims)).all(axis=1)]
+        if len(cells) == 0 or len(self.keys) == 0:
+            return np.zeros(0, dtype=np.int64)
+        keys = self.cellKeys(cells)
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys)-1)
+        pos = pos[self.keys[pos] == keys]
+        counts = self.ends[pos] - self.starts[pos]
+        total = int(counts.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64)
+        firsts = np.repeat(self.starts[pos] - np.cumsum(counts) + counts, counts) + np.arange(total)
+        idx = self.order[firsts]
+        return idx[self.alive[idx]]
+
+    def neighborLists(self, radius=0, chunkSize=20000):
+        """for every point, all other points closer than radius (default and at most cellSize), nearest first
+        these are all in its own cell and the 26 cells around it, so the lists are complete
+        returns (starts, indices, distances), the neighbors of point i are indices[starts[i]:starts[i+1]]"""
+        count = len(self.arr)
+        radius = self.cellSize if radius <= 0 else min(radius, self.cellSize)
+        cells = self.cells[self.order[self.starts]] #grid cell of each occupied cell
+        sizes = self.ends - self.starts
+        #each pair of cells once: a cell with itself and with the 13 cells after it, none across flat axes
+        offsets = [o for o in itertools.product((-1,0,1), repeat=3) if o >= (0,0,0) and all(o[a] == 0 or self.dims[a] > 1 for a in range(3))]
+        xs, ys, zs = [self.arr[self.order,a] for a in range(3)] #grouped by cell, as the pairs are made
+        qq = [np.zeros(0, dtype=np.int64)]
+        cc = [np.zeros(0, dtype=np.int64)]
+        dd = [np.zeros(0)]
+        for start in range(0, len(self.keys), chunkSize):
+            block = np.arange(start, min(start + chunkSize, len(self.keys)))
+            aa = []
+            bb = []
+            for offset in offsets:
+                other = cells[block] + offset
+                valid = ((other >= 0) & (other < self.dims)).all(axis=1)
+                keys = self.cellKeys(other[valid])
+                pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys)-1)
+                found = self.keys[pos] == keys
+                aa.append(block[valid][found])
+                bb.append(pos[found])
+            aa = np.concatenate(aa)
+            bb = np.concatenate(bb)
+            #every point of cell aa with every point of cell bb
+            pairs = sizes[aa] * sizes[bb]
+            total = int(pairs.sum())
+            which = np.repeat(np.arange(len(aa)), pairs)
+            rank = np.arange(total) - np.repeat(np.cumsum(pairs) - pairs, pairs)
+            width = sizes[bb][which]
+            ii = self.starts[aa][which] + rank // width #positions in self.order
+            jj = self.starts[bb][which] + rank % width
+            d = (xs[ii] - xs[jj])**2 + (ys[ii] - ys[jj])**2 + (zs[ii] - zs[jj])**2
+            keep = (d <= radius * radius) & ((aa[which] != bb[which]) | (ii < jj)) #pairs within a cell once
+            ii = self.order[ii[keep]]
+            jj = self.order[jj[keep]]
+            d = np.sqrt(d[keep])
+            qq += [ii, jj]
+            cc += [jj, ii]
+            dd += [d, d]
+        qq = np.concatenate(qq)
+        order = np.argsort(qq * 2.0 + np.concatenate(dd) / radius) #by point, then by distance (d <= radius)
+        starts = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(qq, minlength=count), out=starts[1:])
+        return starts, np.concatenate(cc)[order], np.concatenate(dd)[order]
+
+    def neighbors(self, k, radius=0):
+        """for every point, up to k nearest other points closer than radius (default and at most cellSize)
+        any point left out is farther away than the last one listed (see neighborLists())
+        returns (indices, distances), NxK arrays nearest first, padded with -1 and inf"""
+        count = len(self.arr)
+        starts, nbrs, dists = self.neighborLists(radius)
+        indices = np.full((count,k), -1, dtype=np.int64)
+        distances = np.full((count,k), np.inf)
+        point = np.repeat(np.arange(count), np.diff(starts))
+        rank = np.arange(len(nbrs)) - starts[point]
+        keep = rank < k
+        indices[point[keep], rank[keep]] = nbrs[keep]
+        distances[point[keep], rank[keep]] = dists[keep]
+        return indices, distances
+
+    def kNearest(self, pt, k, exclude=None):
+        """pt is a point (vector or x,y,z), exclude is optional boolean mask of points to skip
+        returns (indices, distances) of the k nearest points, nearest first"""
+        pt = np.array([pt[0],pt[1],pt[2]], dtype=np.float64)
+        center = self.cellOf(pt)
+        rings = int(np.max(np.maximum(np.abs(center), np.abs(self.dims - 1 - center)))) + 1 #enough rings to cover the grid
+        found = []
+        count = 0
+        for ring in range(rings):
+            if ring > 2 and (2 * ring + 1) ** 3 > len(self.arr): #mostly empty cells now, quicker to check all points
+                break
+            idx = self.shell(center, ring)
+            if exclude is not None:
+                idx = idx[~exclude[idx]]
+            if len(idx):
+                found.append(idx)
+                count += len(idx)
+            if count >= k:
+                idx = np.concatenate(found)
+                d = np.sqrt(((self.arr[idx] - pt)**2).sum(axis=1))
+                part = np.argsort(d, kind="stable")[:k]
+                #points outside the searched cells are at least ring cells away
+                if d[part[-1]] <= ring * self.cellSize:
+                    return idx[part], d[part]
+        mask = self.alive if exclude is None else self.alive & ~exclude #fall back to all remaining points
+        idx = np.nonzero(mask)[0]
+        d = np.sqrt(((self.arr[idx] - pt)**2).sum(axis=1))
+        part = np.argsort(d, kind="stable")[:k]
+        return idx[part], d[part]
+
+    def nearest(self, pt, exclude=None):
+        """returns (index, distance) of the nearest point, (-1, inf) if there are none"""
+        idx, d = self.kNearest(pt, 1, exclude)
+        if len(idx) == 0:
+            return -1, float("inf")
+        return int(idx[0]), float(d[0])
+
+    def radius(self, pt, r):
+        """returns indices of the points closer than r to pt, nearest first"""
+        pt = np.array([pt[0],pt[1],pt[2]], dtype=np.float64)
+        lo = self.cellOf(pt - r)
+        hi = self.cellOf(pt + r)
+        rings = int(np.max(hi - lo)) // 2 + 2
+        if (2 * rings + 1) ** 3 > len(self.arr): #mostly empty cells, quicker to check all points
+            idx = np.nonzero(self.alive)[0]
+        else:
+            idx = np.concatenate([self.shell(lo + (hi - lo) // 2, ring) for ring in range(rings)])
+        d = np.sqrt(((self.arr[idx] - pt)**2).sum(axis=1))
+        inside = d < r
+        idx = idx[inside]
+        return idx[np.argsort(d[inside], kind="stable")]
+
+    def hasPoint(self, pt, tol):
+        """True if any point is closer than tol to pt"""
+        return len(self.radius(pt, tol)) > 0
+
+class RemainingPoints:
+    """the points of an Nx3 array not taken yet, for loops that take them one at a time
+    a point is taken by setting taken[i] to 1, the cells drop their taken points when next searched
+    nearest() searches in plain Python, numpy calls cost more than the search itself at this scale:
+    first the grid cells a few rings around the query point, then the coarse cells a few rings around it,
+    only then all coarse cells in order of distance, so the points left are seldom all checked"""
+    def __init__(self, arr, cellSize, coarseFactor=6, maxCells=125, maxCoarseCells=200):
+        """arr is Nx3 array, cellSize is edge length of the grid cubes, coarse cubes are coarseFactor times that
+        maxCells and maxCoarseCells are how many cells around the query point are searched at each level"""
+        arr = np.asarray(arr, dtype=np.float64).reshape(-1,3)
+        self.xs, self.ys, self.zs = [arr[:,a].tolist() for a in range(3)]
+        self.taken = bytearray(len(arr)) #taken[i] is 1 once point i is taken
+        self.fine = self.Level(PointIndex(arr, cellSize), maxCells)
+        coarse = PointIndex(arr, cellSize * coarseFactor)
+        self.coarse = self.Level(coarse, maxCoarseCells)
+        self.coarseKeys = coarse.keys.tolist()
+        self.coarseLo = coarse.cells[coarse.order[coarse.starts]] * coarse.cellSize + coarse.origin
+        self.coarseHi = self.coarseLo + coarse.cellSize
+        self.coarseEmpty = np.zeros(len(coarse.keys), dtype=bool)
+
+    class Level:
+        """the cells of one grid as a dict of key: points left, and the key offsets of the cells by ring"""
+        def __init__(self, index, maxCells):
+            self.origin = index.origin.tolist()
+            self.size = index.cellSize
+            self.dims = index.dims.tolist()
+            order = index.order.tolist()
+            self.cells = dict(zip(index.keys.tolist(), [order[s:e] for s, e in zip(index.starts.tolist(), index.ends.tolist())]))
+            #up to maxCells cells in all, none across flat axes
+            self.rings = []
+            cells = 0
+            dx, dy, dz = self.dims
+            while True:
+                ring = len(self.rings)
+                span = [range(-ring, ring+1) if d > 1 else (0,) for d in self.dims]
+                offsets = [o for o in itertools.product(*span) if max(map(abs, o)) == ring]
+                cells += len(offsets)
+                if ring and (cells > maxCells or ring >= max(self.dims)):
+                    break
+                self.rings.append([(x * dy + y) * dz + z for x, y, z in offsets])
+
+    def searchRings(self, level, px, py, pz, best, found, giveUp=0):
+        """checks the cells of level ring by ring around px,py,pz, best is a squared distance
+        stops early after ring giveUp if nothing was found
+        returns (best, found, done), done is True if no point left outside the searched cells is closer"""
+        xs, ys, zs = self.xs, self.ys, self.zs
+        taken = self.taken
+        size = level.size
+        dims = level.dims
+        fx = (px - level.origin[0]) / size
+        fy = (py - level.origin[1]) / size
+        fz = (pz - level.origin[2]) / size
+        cx, cy, cz = int(fx // 1), int(fy // 1), int(fz // 1)
+        if not (0 <= cx < dims[0] and 0 <= cy < dims[1] and 0 <= cz < dims[2]):
+            return best, found, False
+        center = (cx * dims[1] + cy) * dims[2] + cz
+        #how far the point is from the sides of its own cell
+        margin = 1.0
+        for f, c, d in ((fx,cx,dims[0]), (fy,cy,dims[1]), (fz,cz,dims[2])):
+            if d > 1:
+                margin = min(margin, f - c, c + 1 - f)
+        margin *= size
+        cells = level.cells
+        #keys off the edges of the grid may land on other cells, that only adds points to check
+        for ring, offsets in enumerate(level.rings):
+            for offset in offsets:
+                key = center + offset
+                pts = cells.get(key)
+                if pts is None:
+                    continue
+                left = [q for q in pts if not taken[q]]
+                if len(left) < len(pts):
+                    if not left:
+                        del cells[key]
+                        continue
+                    cells[key] = left
+                for q in left:
+                    dx = xs[q] - px
+                    dy = ys[q] - py
+                    dz = zs[q] - pz
+                    d = dx*dx + dy*dy + dz*dz
+                    if d < best:
+                        best = d
+                        found = q
+            #points outside the searched cells are farther than this
+            reach = ring * size + margin
+            if best <= reach * reach:
+                return best, found, True
+            if found == -1 and giveUp and ring >= giveUp:
+                break #nothing close, the next level finds it sooner
+        return best, found, False
+
+    def nearest(self, pt):
+        """pt is x,y,z
+        returns (index, distance) of the nearest point not taken yet, (-1, inf) if there are none"""
+        px, py, pz = float(pt[0]), float(pt[1]), float(pt[2])
+        best, found, done = self.searchRings(self.fine, px, py, pz, math.inf, -1, giveUp=2)
+        if not done:
+            best, found, done = self.searchRings(self.coarse, px, py, pz, best, found)
+        if done:
+            return found, math.sqrt(best)
+        #far from everything left, every coarse cell that could hold a closer point, nearest first
+        xs, ys, zs = self.xs, self.ys, self.zs
+        taken = self.taken
+        cells = self.coarse.cells
+        p = np.array([px,py,pz])
+        gap = (np.maximum(np.maximum(self.coarseLo - p, p - self.coarseHi), 0)**2).sum(axis=1)
+        candidates = np.nonzero(~self.coarseEmpty & (gap < best))[0]
+        candidates = candidates[np.argsort(gap[candidates], kind="stable")]
+        for cell, g in zip(candidates.tolist(), gap[candidates].tolist()):
+            if g >= best:
+                break
+            key = self.coarseKeys[cell]
+            left = [q for q in cells.get(key, ()) if not taken[q]]
+            if not left:
+                cells.pop(key, None)
+                self.coarseEmpty[cell] = True
+                continue
+            cells[key] = left
+            for q in left:
+                dx = xs[q] - px
+                dy = ys[q] - py
+                dz = zs[q] - pz
+                d = dx*dx + dy*dy + dz*dz
+                if d < best:
+                    best = d
+                    found = q
+        return found, math.sqrt(best)
+
+def nearestNeighborTour(arr, improve=False):
+    """ nearestNeighborTour(arr, improve=False)
+        arr is Nx3 array, arr[0] is taken first, then the nearest point to it, then the nearest
+        point to that one, and so on.  Duplicate points are skipped.
+        the close neighbors of each point come from a PointIndex in bulk, only when they are all used
+        is the nearest point left searched for (see RemainingPoints)
+        if improve is True, crossings in the closed loop are then removed with 2-opt moves (see improveTour())
+        returns indices into arr in visiting order"""
+    arr = np.asarray(arr, dtype=np.float64).reshape(-1,3)
+    if len(arr) == 0:
+        return []
+    keep = firstUnique(arr) #first occurrence of each point, in the original order
+    arr = arr[keep]
+    count = len(arr)
+    cellSize = voxelSizeForCount(arr, max(count // 2, 1))
+    #renumbered by grid cell, so points close together are close together in memory too
+    order = PointIndex(arr, cellSize).order
+    keep = keep[order]
+    arr = arr[order]
+    index = PointIndex(arr, cellSize)
+    starts, nbrs, nbrDist = index.neighborLists()
+    starts = starts.tolist()
+    flat = nbrs.tolist()
+    remaining = RemainingPoints(arr, index.cellSize * 2) #about the distance left to go at a dead end
+    taken = remaining.taken
+    xs, ys, zs = remaining.xs, remaining.ys, remaining.zs
+    cur = int(np.argmin(order)) #arr[0] before renumbering
+    taken[cur] = 1
+    tour = [cur]
+    for ii in range(1, count):
+        nxt = -1
+        for c in flat[starts[cur]:starts[cur+1]]: #all points within cellSize, so the first one not taken is the nearest
+            if not taken[c]:
+                nxt = c
+                break
+        if nxt == -1: #all close neighbors already used
+            nxt = remaining.nearest((xs[cur], ys[cur], zs[cur]))[0]
+        taken[nxt] = 1
+        tour.append(nxt)
+        cur = nxt
+    if improve and count > 3:
+        tour = improveTour(arr, tour, (starts, flat, nbrDist))
+    return keep[tour].tolist()
+
+def improveTour(arr, tour, nbrs, maxReverse=1000):
+    """ improveTour(arr, tour, nbrs, maxReverse=1000)
+        arr is Nx3 array, tour is a list of indices into arr visiting each point once, as a closed loop
+        nbrs is (starts, indices, distances) of candidate neighbors for each point, nearest first
+        (see PointIndex.neighborLists())
+        2-opt: if joining a point to one of its neighbors instead of its successor (or predecessor)
+        shortens the loop, the part of the loop in between is reversed, or the rest of the loop if that
+        is shorter.  The ends of the changed edges are checked again, until no move shortens the loop
+        moves reversing more than maxReverse points are skipped, these few long reversals took most
+        of the time while gaining little
+        returns the improved tour, still starting at tour[0]"""
+    arr = np.asarray(arr, dtype=np.float64).reshape(-1,3)
+    starts, flat, flatDist = [np.asarray(a).tolist() for a in nbrs]
+    xs, ys, zs = [arr[:,a].tolist() for a in range(3)]
+    hypot = math.hypot
+    tour = list(tour)
+    count = len(tour)
+    pos = [0] * count
+    for i, p in enumerate(tour):
+        pos[p] = i
+    start = tour[0]
+    todo = tour[::-1] #points to check, last one first
+    queued = bytearray(b"\x01") * count
+    while todo:
+        a = todo.pop()
+        queued[a] = 0
+        i = pos[a]
+        moved = False
+        for step in (1, -1):
+            if moved:
+                break #a is checked again later
+            b = tour[(i + step) % count]
+            dab = hypot(xs[a] - xs[b], ys[a] - ys[b], zs[a] - zs[b])
+            for m in range(starts[a], starts[a+1]):
+                dac = flatDist[m]
+                if dac >= dab:
+                    break #neighbors are sorted by distance, no gain possible after this
+                c = flat[m]
+                j = pos[c]
+                e = tour[(j + step) % count]
+                if e == a or c == b:
+                    continue
+                #edges (a,b) and (c,e) become (a,c) and (b,e), reversing b..c (or e..a) in the loop
+                lo, hi = (i, j) if step == 1 else ((j - 1) % count, (i - 1) % count)
+                length = (hi - lo) % count
+                if length * 2 > count:
+                    lo, hi = hi, lo
+                    length = count - length
+                if length > maxReverse:
+                    continue
+                dce = hypot(xs[c] - xs[e], ys[c] - ys[e], zs[c] - zs[e])
+                dbe = hypot(xs[b] - xs[e], ys[b] - ys[e], zs[b] - zs[e])
+                if dab + dce - dac - dbe > 1e-12:
+                    if lo + length < count:
+                        tour[lo+1:lo+length+1] = tour[lo+1:lo+length+1][::-1]
+                        seg = range(lo + 1, lo + length + 1)
+                    else: #wraps around the end of the list
+                        seg = [x % count for x in range(lo + 1, lo + length + 1)]
+                        pts = [tour[x] for x in seg]
+                        for x, p in zip(seg, reversed(pts)):
+                            tour[x] = p
+                    for x in seg:
+                        pos[tour[x]] = x
+                    for p in (a, b, c, e):
+                        if not queued[p]:
+                            queued[p] = 1
+                            todo.append(p)
+                    moved = True
+                    break
+    i = pos[start]
+    return tour[i:] + tour[:i]
+
+######################################################################################
+# edges and facets
+
+def edgeKeys(facets, base):
+    """ edgeKeys(facets, base)
+        facets is Mx3 array of point indices, base is greater than the highest point index
+        returns sorted array of the unique int64 keys lower index * base + higher index
+        edges with both ends on the same point are skipped"""
+    facets = np.asarray(facets, dtype=np.int64).reshape(-1,3)
+    ends = np.roll(facets, -1, axis=1)
+    lo = np.minimum(facets, ends).ravel()
+    hi = np.maximum(facets, ends).ravel()
+    keep = lo != hi #both ends on the same point
+    keys = lo[keep] * base + hi[keep]
+    keys.sort()
+    firsts = np.ones(len(keys), dtype=bool)
+    firsts[1:] = keys[1:] != keys[:-1]
+    return keys[firsts]
+
+def uniqueEdges(facets):
+    """ uniqueEdges(facets)
+        facets is Mx3 array of point indices, one row per triangle
+        returns Kx2 int64 array of the unique edges as (lower index, higher index) pairs, sorted
+        each pair is packed into a single int64 key, so no float ids and no python loop"""
+    facets = np.asarray(facets, dtype=np.int64).reshape(-1,3)
+    if len(facets) == 0:
+        return np.zeros((0,2), dtype=np.int64)
+    base = int(facets.max()) + 1
+    keys = edgeKeys(facets, base)
+    return np.column_stack((keys // base, keys % base))
+
+def parallelUniqueEdges(facets, threads=0, chunks=0, progress=None):
+    """ parallelUniqueEdges(facets, threads=0, chunks=0, progress=None)
+        same result as uniqueEdges(), in a pool of threads (numpy releases the GIL while sorting)
+        first the facets are split into chunks whose sorted keys are found, then the keys are split
+        into buckets by ranges of the lower point index, one per thread, and each bucket is merged
+        on its own, dropping the edges shared by neighboring chunks.  The buckets do not overlap,
+        so they are joined in order without sorting all the keys again.
+        threads = 0 means one per cpu, chunks = 0 means 4 per thread
+        progress is an optional function called with (tasks done, tasks) as each chunk and bucket
+        finishes, if it returns True the work is canceled and None is returned"""
+    facets = np.asarray(facets, dtype=np.int64).reshape(-1,3)
+    if len(facets) == 0:
+        return np.zeros((0,2), dtype=np.int64)
+    threads = threads if threads > 0 else (os.cpu_count() or 1)
+    chunks = min(chunks if chunks > 0 else threads * 4, len(facets))
+    base = int(facets.max()) + 1
+    #bucket bounds, lower point indices splitting a sample of the edges evenly
+    sample = facets[::max(len(facets) // 100000, 1)]
+    lows = np.minimum(sample, np.roll(sample, -1, axis=1)).ravel()
+    bounds = np.unique(np.percentile(lows, np.linspace(0, 100, threads + 1)[1:-1]).astype(np.int64))
+    keyBounds = bounds * base #first key of each bucket after the first
+    tasks = chunks + len(bounds) + 1
+    done = [0]
+    def finished(futures):
+        """waits for futures, returns their results in order, or None if canceled"""
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
+            done[0] += 1
+            if progress and progress(done[0], tasks):
+                for f in futures:
+                    f.cancel()
+                return None
+        return [f.result() for f in futures]
+    def merge(parts):
+        keys = np.concatenate(parts)
+        keys.sort()
+        firsts = np.ones(len(keys), dtype=bool)
+        firsts[1:] = keys[1:] != keys[:-1] #edges on chunk boundaries were found more than once
+        return keys[firsts]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as pool:
+        results = finished([pool.submit(edgeKeys, part, base) for part in np.array_split(facets, chunks)])
+        if results is None:
+            return None
+        #each chunk's keys are sorted, so each bucket is a slice of them
+        cuts = [np.concatenate(([0], np.searchsorted(keys, keyBounds), [len(keys)])) for keys in results]
+        buckets = [[keys[c[b]:c[b+1]] for keys, c in zip(results, cuts)] for b in range(len(bounds) + 1)]
+        results = finished([pool.submit(merge, parts) for parts in buckets])
+        if results is None:
+            return None
+    keys = np.concatenate(results)
+    return np.column_stack((keys // base, keys % base))
+
+def facetNormals(arr, facets):
+    """ facetNormals(arr, facets)
+        arr is Nx3 array of points, facets is Mx3 array of indices into arr
+        returns Mx3 array of unit normals, zero vectors for zero area facets"""
+    p0 = arr[facets[:,0]]
+    normals = np.cross(arr[facets[:,1]] - p0, arr[facets[:,2]] - p0)
+    lengths = np.sqrt((normals**2).sum(axis=1))
+    lengths[lengths == 0] = 1
+    return normals / lengths[:,None]
+
+def featureEdges(arr, facets, angle):
+    """ featureEdges(arr, facets, angle)
+        arr is Nx3 array of points, facets is Mx3 array of indices into arr, angle in degrees
+        returns Kx2 array of the edges that are boundary edges (1 facet), non-manifold edges (3+ facets)
+        or where the normals of the 2 facets sharing the edge differ by more than angle"""
+    facets = np.asarray(facets, dtype=np.int64).reshape(-1,3)
+    if len(facets) == 0:
+        return np.zeros((0,2), dtype=np.int64)
+    ends = np.roll(facets, -1, axis=1)
+    lo = np.minimum(facets, ends).ravel()
+    hi = np.maximum(facets, ends).ravel()
+    owner = np.repeat(np.arange(len(facets)), 3) #facet each edge came from
+    base = int(hi.max()) + 1
+    keys = lo * base + hi
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    owner = owner[order]
+    firsts = np.ones(len(keys), dtype=bool)
+    firsts[1:] = keys[1:] != keys[:-1]
+    starts = np.nonzero(firsts)[0]
+    counts = np.diff(np.append(starts, len(keys)))
+    keep = counts != 2
+    #edges shared by exactly 2 facets, compare the facet normals
+    normals = facetNormals(arr, facets)
+    pairs = np.nonzero(counts == 2)[0]
+    cosines = (normals[owner[starts[pairs]]] * normals[owner[starts[pairs]+1]]).sum(axis=1)
+    keep[pairs] = cosines < math.cos(math.radians(angle))
+    ukeys = keys[starts[keep]]
+    edges = np.column_stack((ukeys // base, ukeys % base))
+    return edges[edges[:,0] != edges[:,1]]
+
+def facetDefects(arr, facets, tol):
+    """ facetDefects(arr, facets, tol)
+        arr is Nx3 array of points, facets is Mx3 array of indices into arr
+        returns 3 boolean arrays of length M:
+        short: facets with an edge shorter than tol (including repeated point indices)
+        flat: other facets thinner than tol, the 3 points are on a line (zero area)
+        duplicate: facets using the same 3 points as an earlier facet, in any order"""
+    facets = np.asarray(facets, dtype=np.int64).reshape(-1,3)
+    if len(facets) == 0:
+        empty = np.zeros(0, dtype=bool)
+        return empty, empty, empty
+    a, b, c = arr[facets[:,0]], arr[facets[:,1]], arr[facets[:,2]]
+    lengths = np.column_stack((np.linalg.norm(b - a, axis=1), np.linalg.norm(c - b, axis=1), np.linalg.norm(a - c, axis=1)))
+    short = (lengths < tol).any(axis=1) | (facets[:,0] == facets[:,1]) | (facets[:,1] == facets[:,2]) | (facets[:,2] == facets[:,0])
+    doubleArea = np.linalg.norm(np.cross(b - a, c - a), axis=1)
+    flat = ~short & (doubleArea < tol * lengths.max(axis=1)) #height over the longest edge < tol
+    ordered = np.sort(facets, axis=1)
+    order = np.lexsort((ordered[:,2], ordered[:,1], ordered[:,0]))
+    ordered = ordered[order]
+    repeats = np.zeros(len(facets), dtype=bool)
+    repeats[1:] = (ordered[1:] == ordered[:-1]).all(axis=1)
+    duplicate = np.zeros(len(facets), dtype=bool)
+    duplicate[order] = repeats #first of each group is kept
+    return short, flat, duplicate
+
+def boundaryEdges(facets):
+    """ boundaryEdges(facets)
+        facets is Mx3 array of point indices, one row per triangle
+        returns Kx2 array of the edges used by exactly one facet (the rims of holes and open meshes)"""
+    facets = np.asarray(facets, dtype=np.int64).reshape(-1,3)
+    if len(facets) == 0:
+        return np.zeros((0,2), dtype=np.int64)
+    ends = np.roll(facets, -1, axis=1)
+    lo = np.minimum(facets, ends).ravel()
+    hi = np.maximum(facets, ends).ravel()
+    keep = lo != hi #both ends on the same point
+    base = int(hi.max()) + 1
+    keys = lo[keep] * base + hi[keep]
+    keys.sort()
+    firsts = np.ones(len(keys), dtype=bool)
+    firsts[1:] = keys[1:] != keys[:-1]
+    starts = np.nonzero(firsts)[0]
+    counts = np.diff(np.append(starts, len(keys))) #number of facets using each edge
+    ukeys = keys[starts[counts == 1]]
+    return np.column_stack((ukeys // base, ukeys % base))
+
+def edgeLengths(arr, edges):
+    """ edgeLengths(arr, edges)
+        arr is Nx3 array of points, edges is Kx2 array of indices into arr
+        returns array of the K edge lengths"""
+    return np.sqrt(((arr[edges[:,0]] - arr[edges[:,1]])**2).sum(axis=1))
+
+def chainEdges(edges, junctions=False):
+    """ chainEdges(edges, junctions=False)
+        edges is Kx2 array of point indices, no duplicates
+        connected edges are chained through the points shared by exactly 2 edges, or if junctions is True
+        through any point that still has unused edges, starting at the points with an odd number of edges,
+        so a mesh wireframe becomes a few long paths (that may pass the same point more than once)
+        returns list of chains, each a list of point indices to be joined in order
+        closed loops have the same point first and last"""
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1,2)
+    if len(edges) == 0:
+        return []
+    if junctions:
+        ends = edges.ravel()
+        degree = np.bincount(ends)
+        offsets = np.concatenate(([0], np.cumsum(degree))).tolist()
+        incident = (np.argsort(ends, kind="stable") // 2).tolist() #edges at each point, grouped by point
+        nextAt = offsets[:-1] #position of the first edge of each point not known to be used
+        left = degree.tolist() #unused edges at each point
+        edgeList = edges.tolist()
+        used = [False] * len(edgeList)
+        chains = []
+
+        def walk(pt):
+            chain = [pt]
+            while True:
+                pos = nextAt[pt]
+                end = offsets[pt+1]
+                while pos < end and used[incident[pos]]:
+                    pos += 1
+                nextAt[pt] = pos
+                if pos == end:
+                    return chain
+                e = incident[pos]
+                used[e] = True
+                a, b = edgeList[e]
+                left[a] -= 1
+                left[b] -= 1
+                pt = b if a == pt else a
+                chain.append(pt)
+
+        #a walk from a point with an odd number of unused edges ends at another such point
+        for pt in np.nonzero(degree % 2)[0].tolist():
+            if left[pt] % 2:
+                chains.append(walk(pt))
+        #what is left has an even number of unused edges at each point, walks end where they start
+        for pt in range(len(left)):
+            while left[pt]:
+                chains.append(walk(pt))
+        return chains
+    degree = np.bincount(edges.ravel())
+    single = (degree[edges[:,0]] != 2) & (degree[edges[:,1]] != 2) #chains of 1 edge, no need to walk them
+    chains = edges[single].tolist()
+    rest = edges[~single]
+    if len(rest) == 0:
+        return chains
+    ends = rest.ravel()
+    counts = np.bincount(ends, minlength=len(degree))
+    offsets = np.concatenate(([0], np.cumsum(counts))).tolist()
+    incident = (np.argsort(ends, kind="stable") // 2).tolist() #remaining edges at each point, grouped by point
+    starts = np.unique(ends[degree[ends] != 2]).tolist()
+    degree = degree.tolist()
+    edgeList = rest.tolist()
+    used = [False] * len(edgeList)
+
+    def walk(pt, e):
+        chain = [pt]
+        while True:
+            used[e] = True
+            a, b = edgeList[e]
+            pt = b if a == pt else a
+            chain.append(pt)
+            if degree[pt] != 2:
+                return chain
+            first = offsets[pt]
+            e = incident[first] if incident[first] != e else incident[first+1]
+            if used[e]: #back at the start of a closed loop
+                return chain
+
+    for pt in starts: #open chains run between points that are not shared by exactly 2 edges
+        for e in incident[offsets[pt]:offsets[pt+1]]:
+            if not used[e]:
+                chains.append(walk(pt, e))
+    for e in range(len(edgeList)): #what is left are closed loops
+        if not used[e]:
+            chains.append(walk(edgeList[e][0], e))
+    return chains
+
+######################################################################################
+# planes
+
+def planeDistances(arr, A, B, C):
+    """ planeDistances(arr, A, B, C)
+        arr is Nx3 array of points, A,B,C are non-colinear vectors (or x,y,z) defining the plane
+        returns array of the N signed distances from the plane, positive on the side of (B-A)x(C-A)"""
+    A, B, C = [np.array([v[0],v[1],v[2]], dtype=np.float64) for v in (A,B,C)]
+    normal = np.cross(B - A, C - A)
+    length = np.linalg.norm(normal)
+    if length == 0:
+        raise Exception("MeshRemodel GeomUtils Error: planeDistances() the 3 points are colinear\n")
+    return (np.asarray(arr, dtype=np.float64).reshape(-1,3) - A) @ (normal / length)
+
+def coplanarMask(arr, trio, tol):
+    """ coplanarMask(arr, trio, tol)
+        arr is Nx3 array of points, trio is a 3-element list of vectors defining the plane
+        tol is the distance from the plane points may be and still count as coplanar
+        returns boolean array, True for the coplanar points, all done in one vectorized pass
+        (unlike isCoplanar(), tol is a distance, not a volume, so it does not depend on the trio spacing)"""
+    return np.abs(planeDistances(arr, trio[0], trio[1], trio[2])) <= tol
+
+def distanceOrder(arr, trio):
+    """ distanceOrder(arr, trio)
+        arr is Nx3 array of points, trio is a 3-element list of vectors defining the plane
+        returns (order, distances): indices of arr sorted by absolute distance from the plane and those
+        distances, ascending.  The points tol or closer to the plane, the same ones coplanarMask() picks, are
+        arr[order[:np.searchsorted(distances, tol, side="right")]], so any tol is a binary search and a slice"""
+    d = np.abs(planeDistances(arr, trio[0], trio[1], trio[2]))
+    order = np.argsort(d, kind="stable")
+    return order, d[order]
+
+def spreadTrio(arr, idx):
+    """ spreadTrio(arr, idx)
+        arr is Nx3 array, idx indices of some of its points (at least 3)
+        returns 3 of idx spread far apart, for a well conditioned plane: the point farthest from
+        their centroid, the point farthest from that, and the point making the largest triangle with both"""
+    pts = arr[idx]
+    a = int(np.argmax(((pts - pts.mean(axis=0))**2).sum(axis=1)))
+    b = int(np.argmax(((pts - pts[a])**2).sum(axis=1)))
+    c = int(np.argmax((np.cross(pts[b] - pts[a], pts - pts[a])**2).sum(axis=1)))
+    return [int(idx[a]), int(idx[b]), int(idx[c])]
+
+def ransacPlanes(arr, threshold, minInliers, maxPlanes=20, iterations=200, sampleSize=20000, seed=0, progress=None, index=None):
+    """ ransacPlanes(arr, threshold, minInliers, maxPlanes=20, iterations=200, sampleSize=20000, seed=0, progress=None, index=None)
+        arr is Nx3 array of points, threshold is the max distance of a point from its plane
+        planes are found one at a time, largest first: each of iterations candidate planes goes through a random
+        point and 2 points among its nearest neighbors (from a PointIndex, so smaller planes are found too), and all
+        candidates are scored at once on a random sample of sampleSize of the points not yet used.  The best one is
+        refitted to its inliers by least squares, its inliers are removed, and the search goes on until a plane
+        has fewer than minInliers points or maxPlanes are found.
+        progress is an optional function called with (planes found, maxPlanes), if it returns True the search stops
+        index is an optional PointIndex of arr to use, e.g. one kept with the points object, it is not changed
+        returns list of (trio, inliers): trio is 3 indices into arr of inliers spread far apart (see spreadTrio()),
+        which define the plane, and inliers is array of indices of the points within threshold of that plane"""
+    arr = np.asarray(arr, dtype=np.float64).reshape(-1,3)
+    rng = np.random.default_rng(seed)
+    index = index if index is not None else PointIndex(arr)
+    used = np.zeros(len(arr), dtype=bool) #inliers of the planes found so far
+    remaining = np.arange(len(arr))
+    planes = []
+    while len(planes) < maxPlanes and len(remaining) >= max(minInliers, 3):
+        #candidate planes from local samples
+        seeds = remaining[rng.integers(len(remaining), size=iterations)]
+        bases = []
+        normals = []
+        for seedIdx in seeds:
+            nbrs = index.kNearest(arr[seedIdx], 16, used)[0]
+            if len(nbrs) < 3:
+                continue
+            p0 = arr[nbrs[0]]
+            p1 = arr[nbrs[-1]] #farthest of the neighbors
+            cross = np.cross(p1 - p0, arr[nbrs[1:-1]] - p0)
+            n = cross[np.argmax((cross**2).sum(axis=1))]
+            length = np.linalg.norm(n)
+            if length > 0:
+                bases.append(p0)
+                normals.append(n / length)
+        if not bases:
+            break
+        bases = np.array(bases)
+        normals = np.array(normals)
+        sample = arr[remaining[rng.choice(len(remaining), size=min(sampleSize, len(remaining)), replace=False)]]
+        #all candidates scored at once, one row per candidate
+        scores = (np.abs(sample @ normals.T - (bases * normals).sum(axis=1)) <= threshold).sum(axis=0)
+        best = int(np.argmax(scores))
+        pts = arr[remaining]
+        mask = np.abs((pts - bases[best]) @ normals[best]) <= threshold
+        if mask.sum() >= 3: #least squares refit: normal is the direction of least spread of the inliers
+            centroid = pts[mask].mean(axis=0)
+            normal = np.linalg.svd(pts[mask] - centroid, full_matrices=False)[2][2]
+            mask = np.abs((pts - centroid) @ normal) <= threshold
+        inliers = remaining[mask]
+        if len(inliers) < max(minInliers, 3):
+            break
+        planes.append((spreadTrio(arr, inliers), inliers))
+        used[inliers] = True
+        remaining = remaining[~mask]
+        if progress and progress(len(planes), maxPlanes):
+            break
+    return planes
+
+def flattenArray(arr, base, normal, tol=1e-7):
+    """ flattenArray(arr, base, normal, tol=1e-7)
+        arr is Nx3 array, base is a point on the plane, normal is the plane normal
+        all points are projected to the plane at once, then duplicates are removed by rounding
+        the projected coordinates to multiples of tol and hashing them
+        returns Mx3 array of the projected points, first of each duplicate kept, in the original order"""
+    base = np.array([base[0],base[1],base[2]], dtype=np.float64)
+    normal = np.array([normal[0],normal[1],normal[2]], dtype=np.float64)
+    normal = normal / np.linalg.norm(normal)
+    arr = np.asarray(arr, dtype=np.float64).reshape(-1,3)
+    flat = arr - np.outer((arr - base) @ normal, normal)
+    return flat[firstUnique(flat, tol)]
+
+######################################################################################
+# triangles
+
+def triangleArray(arr, facets=None):
+    """ triangleArray(arr, facets=None)
+        arr is Nx3 array of points and facets Mx3 array of indices into arr, returns Mx3x3 array of triangles
+        if facets is None arr is taken to be triangles already and is returned as Mx3x3 array"""
+    arr = np.asarray(arr, dtype=np.float64)
+    if facets is None:
+        return arr.reshape(-1,3,3)
+    return arr[np.asarray(facets, dtype=np.int64).reshape(-1,3)]
+
+def triangleAreas(tris):
+    """ triangleAreas(tris)
+        tris is Mx3x3 array of triangles
+        returns array of M areas"""
+    tris = triangleArray(tris)
+    return 0.5 * np.linalg.norm(np.cross(tris[:,1] - tris[:,0], tris[:,2] - tris[:,0]), axis=1)
+
+def circumcenters(tris):
+    """ circumcenters(tris)
+        tris is Mx3x3 array of triangles (see triangleArray())
+        returns Mx3 array of circumcenters, nan for colinear triangles"""
+    tris = triangleArray(tris)
+    A = tris[:,0]
+    ab = tris[:,1] - A
+    ac = tris[:,2] - A
+    n = np.cross(ab, ac)
+    nn = (n*n).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        offset = (np.cross(n, ab) * (ac*ac).sum(axis=1)[:,None] + np.cross(ac, n) * (ab*ab).sum(axis=1)[:,None]) / (2.0 * nn[:,None])
+    offset[nn == 0] = np.nan
+    return A + offset
+
+def circumradii(tris):
+    """ circumradii(tris)
+        tris is Mx3x3 array of triangles
+        returns array of M circumradii, nan for colinear triangles"""
+    tris = triangleArray(tris)
+    return np.linalg.norm(circumcenters(tris) - tris[:,0], axis=1)
+
+def incenters(tris):
+    """ incenters(tris)
+        tris is Mx3x3 array of triangles
+        returns Mx3 array of incenters, nan for colinear triangles"""
+    tris = triangleArray(tris)
+    a = np.linalg.norm(tris[:,2] - tris[:,1], axis=1) #side opposite each corner
+    b = np.linalg.norm(tris[:,0] - tris[:,2], axis=1)
+    c = np.linalg.norm(tris[:,1] - tris[:,0], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        centers = (a[:,None]*tris[:,0] + b[:,None]*tris[:,1] + c[:,None]*tris[:,2]) / (a+b+c)[:,None]
+    centers[triangleAreas(tris) == 0] = np.nan
+    return centers
+
+def inradii(tris):
+    """ inradii(tris)
+        tris is Mx3x3 array of triangles
+        returns array of M inradii (area / semiperimeter), 0 for colinear triangles"""
+    tris = triangleArray(tris)
+    perimeter = np.linalg.norm(tris[:,2] - tris[:,1], axis=1) + np.linalg.norm(tris[:,0] - tris[:,2], axis=1) + np.linalg.norm(tris[:,1] - tris[:,0], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        radii = 2.0 * triangleAreas(tris) / perimeter
+    radii[perimeter == 0] = 0.0
+    return radii